@@ -1,25 +1,40 @@
-from applied_task import DesignatedRouterByzantine, RouterGeneral, RouterLieutenant
+from applied_task import (DesignatedRouterByzantine, RouterGeneral, RouterLieutenant, RouterSignedGeneral,
+                          RouterSignedLieutenant)
 from applied_task.network_layer import get_link, LinkInput, LinkOutput
+from applied_task.signer import KeyDirectory
 from functools import partial
 from multiprocessing import Event, Process, Value
 from multiprocessing.sharedctypes import Synchronized
-from typing import List, Tuple
+from typing import List, Literal, Tuple
 
 
-def run_router_general(stop_event: Event, m: int, topology_name: str, id_: int, dr_link_input: LinkInput,
-                       dr_link_output: LinkOutput, lieutenants_links_outputs: List[LinkOutput], is_traitor: bool,
-                       value: Synchronized):
-    router = RouterGeneral(id_, dr_link_input, dr_link_output, lieutenants_links_outputs, is_traitor, topology_name)
+ModeT = Literal['oral', 'signed']
+
+
+def run_router_general(stop_event: Event, m: int, topology_name: str, mode: ModeT, key_directory: KeyDirectory,
+                       id_: int, dr_link_input: LinkInput, dr_link_output: LinkOutput,
+                       lieutenants_links_outputs: List[LinkOutput], is_traitor: bool, value: Synchronized):
+    if mode == 'signed':
+        router = RouterSignedGeneral(id_, dr_link_input, dr_link_output, lieutenants_links_outputs, is_traitor,
+                                     topology_name, key_directory)
+    else:
+        router = RouterGeneral(id_, dr_link_input, dr_link_output, lieutenants_links_outputs, is_traitor,
+                               topology_name)
     router.run(stop_event, m)
     value.value = int(router.value)
 
 
-def run_router_lieutenant(stop_event: Event, m: int, topology_name: str, id_: int, dr_link_input: LinkInput,
-                          dr_link_output: LinkOutput, general_link_input: LinkInput,
+def run_router_lieutenant(stop_event: Event, m: int, topology_name: str, mode: ModeT, key_directory: KeyDirectory,
+                          id_: int, dr_link_input: LinkInput, dr_link_output: LinkOutput, general_link_input: LinkInput,
                           lieutenants_links_inputs: List[LinkInput], lieutenants_links_outputs: List[LinkOutput],
                           is_traitor: bool, value: Synchronized):
-    router = RouterLieutenant(id_, dr_link_input, dr_link_output, general_link_input, lieutenants_links_inputs,
-                              lieutenants_links_outputs, is_traitor, topology_name)
+    if mode == 'signed':
+        router = RouterSignedLieutenant(id_, dr_link_input, dr_link_output, general_link_input,
+                                        lieutenants_links_inputs, lieutenants_links_outputs, is_traitor,
+                                        topology_name, key_directory)
+    else:
+        router = RouterLieutenant(id_, dr_link_input, dr_link_output, general_link_input, lieutenants_links_inputs,
+                                  lieutenants_links_outputs, is_traitor, topology_name)
     router.run(stop_event, m)
     value.value = int(router.value)
 
@@ -30,12 +45,13 @@ def run_designated_router(stop_event: Event, topology_name: str, links_inputs: L
     router.run(stop_event)
 
 
-def byzantine(n: int, m: int, traitors: List[bool], name: str):
+def byzantine(n: int, m: int, traitors: List[bool], name: str, mode: ModeT = 'oral'):
     stop_event = Event()
     values = [Value('i', 0) for _ in range(n)]
+    key_directory = KeyDirectory(n)
 
-    general_runner = partial(run_router_general, stop_event, m, name)
-    lieutenant_runner = partial(run_router_lieutenant, stop_event, m, name)
+    general_runner = partial(run_router_general, stop_event, m, name, mode, key_directory)
+    lieutenant_runner = partial(run_router_lieutenant, stop_event, m, name, mode, key_directory)
     dr_runner = partial(run_designated_router, stop_event, name)
 
     dr_router_links: List[Tuple[LinkOutput, LinkInput]] = [get_link() for _ in range(n)]
@@ -76,6 +92,11 @@ def byzantine(n: int, m: int, traitors: List[bool], name: str):
         lieutenant_process.join()
     stop_event.set()
     dr_process.join()
+    for link_output, _ in dr_router_links + router_dr_links + general_lieutenant_links:
+        link_output.close()
+    for lieutenant_links_outputs in lieutenants_links_outputs:
+        for link_output in lieutenant_links_outputs:
+            link_output.close()
 
     values_ = [bool(value.value) for value in values]
     non_traitors_values = [values_[i + 1] for i in range(n - 1) if not traitors[i + 1]]
@@ -95,7 +116,10 @@ def main():
         '4_1_0-t': dict(n=4, m=1, traitors=[True, False, False, False]),
         '4_1_1-t': dict(n=4, m=1, traitors=[False, True, False, False]),
         '7_2_0-t_4-t': dict(n=7, m=2, traitors=[True, False, False, False, True, False, False]),
-        '7_2_1-t_4-t': dict(n=7, m=2, traitors=[False, True, False, False, True, False, False])
+        '7_2_1-t_4-t': dict(n=7, m=2, traitors=[False, True, False, False, True, False, False]),
+        'signed-4_2_0-t_1-t': dict(n=4, m=2, traitors=[True, True, False, False], mode='signed'),
+        'signed-7_3_1-t_2-t_4-t': dict(n=7, m=3, traitors=[False, True, True, False, True, False, False],
+                                       mode='signed')
     }
     for name, topology in byzantines.items():
         print(name)
@@ -1,3 +1,5 @@
 from .designated_router_byzantine import DesignatedRouterByzantine
 from .router_general import RouterGeneral
 from .router_lieutenant import RouterLieutenant
+from .router_signed_general import RouterSignedGeneral
+from .router_signed_lieutenant import RouterSignedLieutenant
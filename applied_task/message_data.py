@@ -1,3 +1,4 @@
+from .network_layer import register_type
 from typing import List
 
 
@@ -10,3 +11,21 @@ class MessageData:
         self.m = m
         self.value = value
         self.path = path
+
+
+register_type(MessageData, 64, lambda data: (data.m, data.value, data.path), lambda value: MessageData(*value))
+
+
+class SignedMessageData:
+    value: bool
+    path: List[int]
+    signatures: List[bytes]
+
+    def __init__(self, value: bool, path: List[int], signatures: List[bytes]):
+        self.value = value
+        self.path = path
+        self.signatures = signatures
+
+
+register_type(SignedMessageData, 65, lambda data: (data.value, data.path, data.signatures),
+              lambda value: SignedMessageData(*value))
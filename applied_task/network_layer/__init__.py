@@ -1,4 +1,5 @@
+from .codec import decode_message, encode_message, register_type
 from .designated_router import DesignatedRouter
-from .link import get_link, LinkInput, LinkOutput
+from .link import AsyncLinkInput, AsyncLinkOutput, get_link, LinkInput, LinkOutput
 from .message import Message, MessageType
 from .router import Router
@@ -0,0 +1,187 @@
+from .message import (Message, MessageHelloDataT, MessageNextHopsDataT, MessageTopologyDataT,
+                      MessageTopologyUpdateDataT, MessageType)
+from .topology import Topology
+from struct import Struct
+from typing import Any, Callable, Dict, List, Tuple
+
+
+VERSION = 1
+HEADER = Struct('<BBBqq')
+
+_HAS_DST = 1
+_IS_PATH = 2
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _LIST, _TUPLE, _DICT, _INT_LIST = range(11)
+_FIRST_REGISTERED_TAG = 32
+
+_SIZE = Struct('<I')
+_INT_VALUE = Struct('<q')
+_FLOAT_VALUE = Struct('<d')
+
+_MESSAGE_TYPES: Tuple[MessageType, ...] = tuple(MessageType)
+_MESSAGE_TYPE_CODES: Dict[MessageType, int] = {type_: code for code, type_ in enumerate(_MESSAGE_TYPES)}
+
+_ENCODERS: Dict[type, Tuple[int, Callable[[Any], Any]]] = {}
+_DECODERS: Dict[int, Callable[[Any], Any]] = {}
+
+
+def register_type(type_: type, tag: int, to_value: Callable[[Any], Any], from_value: Callable[[Any], Any]):
+    if tag < _FIRST_REGISTERED_TAG or tag > 255:
+        raise ValueError(f'tag must be in [{_FIRST_REGISTERED_TAG}, 255], not {tag}')
+    if tag in _DECODERS or type_ in _ENCODERS:
+        raise ValueError(f'{type_.__name__} or tag {tag} is already registered')
+    _ENCODERS[type_] = (tag, to_value)
+    _DECODERS[tag] = from_value
+
+
+def _is_int_list(value: List[Any]) -> bool:
+    return all(type(item) is int for item in value)
+
+
+def _encode_ints(value: List[int], out: bytearray):
+    out += _SIZE.pack(len(value))
+    out += Struct(f'<{len(value)}q').pack(*value)
+
+
+def _decode_ints(view: memoryview, offset: int) -> Tuple[List[int], int]:
+    (size,) = _SIZE.unpack_from(view, offset)
+    offset += _SIZE.size
+    ints = Struct(f'<{size}q')
+    return list(ints.unpack_from(view, offset)), offset + ints.size
+
+
+def _encode_value(value: Any, out: bytearray):
+    type_ = type(value)
+    if value is None:
+        out.append(_NONE)
+    elif type_ is bool:
+        out.append(_TRUE if value else _FALSE)
+    elif type_ is int:
+        out.append(_INT)
+        out += _INT_VALUE.pack(value)
+    elif type_ is float:
+        out.append(_FLOAT)
+        out += _FLOAT_VALUE.pack(value)
+    elif type_ is str or type_ is bytes:
+        bytes_ = value.encode() if type_ is str else value
+        out.append(_STR if type_ is str else _BYTES)
+        out += _SIZE.pack(len(bytes_))
+        out += bytes_
+    elif type_ is list and _is_int_list(value):
+        out.append(_INT_LIST)
+        _encode_ints(value, out)
+    elif type_ is list or type_ is tuple:
+        out.append(_LIST if type_ is list else _TUPLE)
+        out += _SIZE.pack(len(value))
+        for item in value:
+            _encode_value(item, out)
+    elif type_ is dict:
+        out.append(_DICT)
+        out += _SIZE.pack(len(value))
+        for key, item in value.items():
+            _encode_value(key, out)
+            _encode_value(item, out)
+    elif type_ in _ENCODERS:
+        tag, to_value = _ENCODERS[type_]
+        out.append(tag)
+        _encode_value(to_value(value), out)
+    else:
+        raise TypeError(f'cannot encode value of type {type_.__name__}')
+
+
+def _decode_value(view: memoryview, offset: int) -> Tuple[Any, int]:
+    tag = view[offset]
+    offset += 1
+    if tag == _NONE:
+        return None, offset
+    if tag == _FALSE or tag == _TRUE:
+        return tag == _TRUE, offset
+    if tag == _INT:
+        return _INT_VALUE.unpack_from(view, offset)[0], offset + _INT_VALUE.size
+    if tag == _FLOAT:
+        return _FLOAT_VALUE.unpack_from(view, offset)[0], offset + _FLOAT_VALUE.size
+    if tag == _INT_LIST:
+        return _decode_ints(view, offset)
+    if tag in _DECODERS:
+        value, offset = _decode_value(view, offset)
+        return _DECODERS[tag](value), offset
+    if tag > _INT_LIST:
+        raise ValueError(f'unknown tag {tag}')
+    (size,) = _SIZE.unpack_from(view, offset)
+    offset += _SIZE.size
+    if tag == _STR:
+        return str(view[offset:offset + size], 'utf-8'), offset + size
+    if tag == _BYTES:
+        return bytes(view[offset:offset + size]), offset + size
+    if tag == _DICT:
+        dict_ = {}
+        for _ in range(size):
+            key, offset = _decode_value(view, offset)
+            dict_[key], offset = _decode_value(view, offset)
+        return dict_, offset
+    items = []
+    for _ in range(size):
+        item, offset = _decode_value(view, offset)
+        items.append(item)
+    return (items if tag == _LIST else tuple(items)), offset
+
+
+def encode_value(value: Any) -> bytes:
+    out = bytearray()
+    _encode_value(value, out)
+    return bytes(out)
+
+
+def decode_value(bytes_: bytes) -> Any:
+    return _decode_value(memoryview(bytes_), 0)[0]
+
+
+def encode_message(message: Message) -> bytes:
+    flags = _HAS_DST if message.dst is not None else 0
+    data = message.data
+    is_path = message.type is MessageType.DATA and type(data) is list and _is_int_list(data)
+    if is_path:
+        flags |= _IS_PATH
+    out = bytearray(HEADER.pack(VERSION, _MESSAGE_TYPE_CODES[message.type], flags, message.src,
+                                message.dst if message.dst is not None else 0))
+    if is_path:
+        _encode_ints(data, out)
+    else:
+        _encode_value(data, out)
+    return bytes(out)
+
+
+def decode_message(bytes_: bytes) -> Message:
+    view = memoryview(bytes_)
+    version, type_code, flags, src, dst = HEADER.unpack_from(view, 0)
+    if version != VERSION:
+        raise ValueError(f'unsupported message version {version}, expected {VERSION}')
+    if flags & _IS_PATH:
+        data, offset = _decode_ints(view, HEADER.size)
+    else:
+        data, offset = _decode_value(view, HEADER.size)
+    if offset != len(view):
+        raise ValueError(f'message has {len(view) - offset} trailing bytes')
+    return Message(src, dst if flags & _HAS_DST else None, _MESSAGE_TYPES[type_code], data)
+
+
+def _topology_from_value(value: Tuple[List[int], List[Tuple[int, int, float]]]) -> Topology:
+    nodes, edges = value
+    topology = Topology()
+    for node in nodes:
+        topology.add_node(node)
+    for src, dst, weight in edges:
+        topology.add_edge(src, dst, weight)
+    return topology
+
+
+register_type(MessageHelloDataT, 32, lambda hello: (hello.id, hello.start_time),
+              lambda value: MessageHelloDataT(*value))
+register_type(Topology, 33, lambda topology: (topology.get_nodes(), topology.get_edges()), _topology_from_value)
+register_type(MessageTopologyDataT, 34, lambda data: (data.sequence_number, data.topology),
+              lambda value: MessageTopologyDataT(*value))
+register_type(MessageTopologyUpdateDataT, 35,
+              lambda update: (update.sequence_number, update.removed_nodes, update.removed_edges, update.added_edges),
+              lambda value: MessageTopologyUpdateDataT(*value))
+register_type(MessageNextHopsDataT, 36, lambda data: (data.sequence_number, data.next_hops),
+              lambda value: MessageNextHopsDataT(*value))
@@ -0,0 +1,52 @@
+from heapq import heappop, heappush
+from networkx import DiGraph
+from typing import Dict, List, Tuple
+
+
+class CsrGraph:
+    nodes: List[int]
+    indices: Dict[int, int]
+    offsets: List[int]
+    targets: List[int]
+    weights: List[float]
+
+    def __init__(self, graph: DiGraph):
+        self.nodes = list(graph)
+        self.indices = {node: i for i, node in enumerate(self.nodes)}
+        self.offsets = [0]
+        self.targets = []
+        self.weights = []
+        for node in self.nodes:
+            for neighbor, attrs in graph[node].items():
+                self.targets.append(self.indices[neighbor])
+                self.weights.append(attrs['weight'])
+            self.offsets.append(len(self.targets))
+
+    def get_shortest_ways(self, root_node: int, cost_tolerance: float) -> Tuple[List[float], List[List[int]]]:
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        distances = [float('inf')] * len(self.nodes)
+        predecessors: List[List[int]] = [[] for _ in self.nodes]
+
+        root_index = self.indices[root_node]
+        distances[root_index] = 0
+        queue = [(0, root_index)]
+
+        while len(queue) > 0:
+            (distance, node) = heappop(queue)
+            if distance > distances[node]:
+                continue
+
+            for i in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[i]
+                new_cost = distance + weights[i]
+                difference = new_cost - distances[neighbor]
+                if difference < -cost_tolerance * new_cost:
+                    heappush(queue, (new_cost, neighbor))
+                    distances[neighbor] = new_cost
+                    predecessors[neighbor] = [node]
+                elif difference <= cost_tolerance * new_cost:
+                    predecessors[neighbor].append(node)
+
+        return distances, predecessors
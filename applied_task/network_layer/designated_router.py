@@ -1,7 +1,8 @@
 import os
 
 from .link import LinkInput, LinkOutput
-from .message import Message, MessageType
+from .link_layer import ProcessT, run_process, sleep_process_async
+from .message import Message, MessageNextHopsDataT, MessageTopologyDataT, MessageTopologyUpdateDataT, MessageType
 from .topology import Topology
 from logging import FileHandler, getLogger, INFO, Logger
 from multiprocessing import Event
@@ -20,12 +21,17 @@ class DesignatedRouter:
     _active_nodes: Set[int]
     _disconnection_probabilities: List[float]
     _topology: Optional[Topology]
+    _topology_update: MessageTopologyUpdateDataT
+    _synchronized_nodes: Set[int]
+    _is_routing_precomputed: bool
+    _next_hops: Optional[Dict[int, Dict[int, List[int]]]]
     _topology_name: str
     _logger: Logger
     _sleep_time: float = 0.1
 
     def __init__(self, id_: int, links_inputs: List[LinkInput], links_outputs: List[LinkOutput],
-                 disconnection_probabilities: List[float], topology_name: str, logfile_path: Optional[str] = None):
+                 disconnection_probabilities: List[float], topology_name: str, logfile_path: Optional[str] = None,
+                 is_routing_precomputed: bool = False):
         self._id = id_
         self._links_inputs = links_inputs
         self._links_outputs = links_outputs
@@ -33,6 +39,10 @@ class DesignatedRouter:
         self._active_nodes = set()
         self._disconnection_probabilities = disconnection_probabilities
         self._topology = None
+        self._topology_update = MessageTopologyUpdateDataT(0, [], [], [])
+        self._synchronized_nodes = set()
+        self._is_routing_precomputed = is_routing_precomputed
+        self._next_hops = None
         self._topology_name = topology_name
         self._logger = getLogger('DR')
         self._logger.setLevel(INFO)
@@ -44,15 +54,15 @@ class DesignatedRouter:
         fh.setLevel(INFO)
         self._logger.addHandler(fh)
 
-    def _init_topology_stage(self, stop_event: Event):
+    def _init_topology_process(self, stop_event: Event) -> ProcessT[None]:
         for link in self._links_outputs:
             link.send(Message(self._id, None, MessageType.GET_NEIGHBORS, None))
 
         self._topology = Topology()
         neighbors: Dict[int, Dict[int, int]] = {}
-        is_need_sleep = True
 
         while not stop_event.is_set() and len(self._nodes) != len(self._links_outputs):
+            is_need_sleep = True
             for i, link in enumerate(self._links_inputs):
                 if link.not_empty():
                     message = link.receive()
@@ -66,8 +76,7 @@ class DesignatedRouter:
                             neighbors[neighbor][message.src] = link_id
                     is_need_sleep = False
 
-            if is_need_sleep:
-                sleep(self._sleep_time)
+            yield self._sleep_time if is_need_sleep else 0
 
         self._active_nodes = set(self._nodes)
 
@@ -75,6 +84,9 @@ class DesignatedRouter:
             link = self._links_outputs[self._nodes[active_node]]
             link.send(Message(self._id, active_node, MessageType.SET_NEIGHBORS, neighbors.get(active_node, {})))
 
+    def _init_topology_stage(self, stop_event: Event):
+        run_process(self._init_topology_process(stop_event), sleep)
+
     def _save_graph(self, graph: DiGraph, topology_index: int):
         network = Network(directed=True)
         network.from_nx(graph)
@@ -92,12 +104,47 @@ class DesignatedRouter:
             graph.add_edge(active_node, -1, color='red')
         self._save_graph(graph, topology_index)
 
+    def _send_next_hops(self, node: int):
+        if self._next_hops is not None:
+            link = self._links_outputs[self._nodes[node]]
+            data = MessageNextHopsDataT(self._topology_update.sequence_number, self._next_hops.get(node, {}))
+            link.send(Message(self._id, node, MessageType.SET_NEXT_HOPS, data))
+
+    def _send_topology(self, node: int):
+        self._send_next_hops(node)
+        link = self._links_outputs[self._nodes[node]]
+        data = MessageTopologyDataT(self._topology_update.sequence_number, self._topology)
+        link.send(Message(self._id, node, MessageType.SET_TOPOLOGY, data))
+        self._synchronized_nodes.add(node)
+
     def _set_topology(self, topology_index: int):
+        update = self._topology_update
+        if len(update) > 0:
+            update.sequence_number += 1
+        is_snapshot_cheaper = len(update) >= self._topology.get_edges_count()
+        if self._is_routing_precomputed:
+            self._next_hops = self._topology.all_pairs_next_hops()
         for active_node in self._active_nodes:
-            link = self._links_outputs[self._nodes[active_node]]
-            link.send(Message(self._id, active_node, MessageType.SET_TOPOLOGY, self._topology))
+            if active_node not in self._synchronized_nodes or is_snapshot_cheaper:
+                self._send_topology(active_node)
+            elif len(update) > 0:
+                self._send_next_hops(active_node)
+                link = self._links_outputs[self._nodes[active_node]]
+                link.send(Message(self._id, active_node, MessageType.UPDATE_TOPOLOGY, update))
+        self._topology_update = MessageTopologyUpdateDataT(update.sequence_number, [], [], [])
         self._save_topology(topology_index)
 
+    def _receive_topology_requests(self) -> bool:
+        is_received = False
+        for link in self._links_inputs:
+            if link.not_empty():
+                message = link.receive()
+                if message.type == MessageType.GET_TOPOLOGY and message.src in self._active_nodes:
+                    self._logger.info(f'sending topology snapshot to node {message.src}')
+                    self._send_topology(message.src)
+                is_received = True
+        return is_received
+
     def _start_links(self):
         for link in self._links_inputs:
             link.start_receiving()
@@ -109,13 +156,16 @@ class DesignatedRouter:
             link.stop_sending()
         for link in self._links_inputs:
             link.stop_receiving()
+        for i, link in enumerate(self._links_outputs):
+            self._logger.info(f'output link {i} metrics: {link.metrics.to_dict()}')
+        for i, link in enumerate(self._links_inputs):
+            self._logger.info(f'input link {i} metrics: {link.metrics.to_dict()}')
 
-    def run(self, stop_event: Event, connection_off_event: Event, *args):
+    def _run_process(self, stop_event: Event, connection_off_event: Event) -> ProcessT[None]:
         self._start_links()
-        self._init_topology_stage(stop_event)
+        yield from self._init_topology_process(stop_event)
         is_need_set_topology = True
         topology_index = 0
-        is_need_sleep = True
 
         while not stop_event.is_set():
             if connection_off_event.is_set():
@@ -124,7 +174,9 @@ class DesignatedRouter:
                         is_need_set_topology = True
                         connection_off_event.clear()
                         self._topology.remove_node(active_node)
+                        self._topology_update.removed_nodes.append(active_node)
                         self._active_nodes.remove(active_node)
+                        self._synchronized_nodes.discard(active_node)
                         link = self._links_outputs[self._nodes[active_node]]
                         link.send(Message(self._id, active_node, MessageType.DISCONNECT, None))
                         self._logger.info(f'lost connection to node {active_node}')
@@ -135,7 +187,16 @@ class DesignatedRouter:
                 is_need_set_topology = False
                 topology_index += 1
 
-            if is_need_sleep:
-                sleep(self._sleep_time)
+            is_need_sleep = not self._receive_topology_requests()
+
+            yield self._sleep_time if is_need_sleep else 0
 
         self._stop_links()
+
+    def run(self, stop_event: Event, connection_off_event: Event, *args):
+        run_process(self._run_process(stop_event, connection_off_event), sleep)
+
+    async def run_async(self, stop_event: Event, connection_off_event: Event, *args):
+        await sleep_process_async(self._run_process(stop_event, connection_off_event))
+        for link in self._links_outputs + self._links_inputs:
+            await link.join()
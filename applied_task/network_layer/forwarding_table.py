@@ -0,0 +1,51 @@
+from array import array
+from typing import Dict, List, Tuple
+
+
+class ForwardingTable:
+    _links: Dict[int, Tuple[int, ...]]
+    _destinations: List[int]
+
+    def __init__(self, next_hops: Dict[int, List[int]], neighbors: Dict[int, int]):
+        self._links = {}
+        for node, node_next_hops in next_hops.items():
+            links = tuple(neighbors[next_hop] for next_hop in node_next_hops if next_hop in neighbors)
+            if len(links) > 0:
+                self._links[node] = links
+        self._destinations = list(next_hops)
+
+    @property
+    def destinations(self) -> List[int]:
+        return self._destinations
+
+    def get_link(self, node: int, flow_hash: int = 0) -> int:
+        links = self._links.get(node)
+        return -1 if links is None else links[flow_hash % len(links)]
+
+    def to_dict(self) -> Dict[int, List[int]]:
+        return {node: list(self._links.get(node, ())) for node in self._destinations}
+
+
+class ArrayForwardingTable(ForwardingTable):
+    _offsets: array
+    _flat_links: array
+
+    def __init__(self, next_hops: Dict[int, List[int]], neighbors: Dict[int, int]):
+        super().__init__(next_hops, neighbors)
+        self._offsets = array('i', [0]) * (max(next_hops, default=-1) + 2)
+        self._flat_links = array('i')
+        for node in range(len(self._offsets) - 1):
+            self._flat_links.extend(self._links.get(node, ()))
+            self._offsets[node + 1] = len(self._flat_links)
+
+    def get_link(self, node: int, flow_hash: int = 0) -> int:
+        if not 0 <= node < len(self._offsets) - 1:
+            return -1
+        start = self._offsets[node]
+        count = self._offsets[node + 1] - start
+        return -1 if count == 0 else self._flat_links[start + flow_hash % count]
+
+
+def get_forwarding_table(next_hops: Dict[int, List[int]], neighbors: Dict[int, int]) -> ForwardingTable:
+    is_dense = len(next_hops) > 0 and min(next_hops) >= 0 and max(next_hops) < 2 * len(next_hops)
+    return (ArrayForwardingTable if is_dense else ForwardingTable)(next_hops, neighbors)
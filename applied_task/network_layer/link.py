@@ -1,30 +1,107 @@
-import pickle
+import asyncio
 
-from .link_layer import Connection, ProtocolT, RECEIVER, ReceiverT, SENDER, SenderT
+from .codec import decode_message, encode_message
+from .link_layer import (Ack, Channel, ChannelConnection, ClockT, CONNECTION, CongestionWindow, Connection,
+                         ConnectionTypeT, LinkMetrics, ProcessT, ProtocolT, RECEIVER, RECEIVER_PROCESS,
+                         ReceiverProcessT, ReceiverT, run_process, run_process_async, run_process_while,
+                         run_process_while_async, RttEstimator, SENDER, SENDER_PROCESS, SenderProcessT, SenderResult,
+                         SenderT, SendStream, STREAM_RECEIVER_PROCESS, STREAM_SENDER_PROCESS, StreamReceiverProcessT,
+                         StreamSenderProcessT, wait_readable_async)
 from .message import Message
-from queue import Queue
+from logging import getLogger
+from queue import Empty, Queue
+from random import Random
+from struct import Struct
 from threading import Thread
-from typing import Tuple
+from time import time
+from typing import Optional, Tuple
+
+
+SEGMENT_SIZE = 1024
+FRAME_HEADER = Struct('<I')
+_LOGGER = getLogger(__name__)
 
 
 class LinkInput:
     _connection: Connection
     _receiver: ReceiverT
+    _stream_receiver_process: StreamReceiverProcessT
+    _segment_size: int
+    _ack_every: int
+    _ack_delay: float
+    _receive_window: int
+    _transmission_error_probability: float
+    _random: Random
+    _is_streaming: bool
+    _stream_buffer: bytearray
     _received_messages: Queue
     _is_receiving_running: bool
     _receiving_thread: Thread
+    _wait_time: float = 0.1
+    _linger_time: float = 0.5
 
-    def __init__(self, connection: Connection, protocol: ProtocolT = 'selective_repeat'):
+    def __init__(self, connection: Connection, protocol: ProtocolT = 'selective_repeat',
+                 segment_size: int = SEGMENT_SIZE, ack_every: int = 1, ack_delay: float = 0.005,
+                 receive_window: int = 0, is_streaming: bool = True, transmission_error_probability: float = 0.3,
+                 seed: Optional[int] = None):
         self._connection = connection
         self._receiver = RECEIVER[protocol]
+        self._stream_receiver_process = STREAM_RECEIVER_PROCESS[protocol]
+        self._segment_size = segment_size
+        self._ack_every = ack_every
+        self._ack_delay = ack_delay
+        self._receive_window = receive_window
+        self._transmission_error_probability = transmission_error_probability
+        self._random = Random(seed)
+        self._is_streaming = is_streaming
         self._is_receiving_running = True
 
+    def _put_message(self, bytes_: bytes):
+        self._received_messages.put(decode_message(bytes_))
+        self._connection.metrics.received_messages += 1
+
+    def _put_stream(self, bytes_: bytes):
+        self._stream_buffer += bytes_
+        offset = 0
+        while len(self._stream_buffer) - offset >= FRAME_HEADER.size:
+            (size,) = FRAME_HEADER.unpack_from(self._stream_buffer, offset)
+            if len(self._stream_buffer) - offset - FRAME_HEADER.size < size:
+                break
+            offset += FRAME_HEADER.size
+            self._put_message(bytes(self._stream_buffer[offset:offset + size]))
+            offset += size
+        del self._stream_buffer[:offset]
+
+    def _create_stream_process(self, clock: ClockT) -> ProcessT[int]:
+        self._stream_buffer = bytearray()
+        return self._stream_receiver_process(self._transmission_error_probability, self._connection,
+                                             self._put_stream, self._segment_size, self._ack_every, self._ack_delay,
+                                             self._receive_window, clock, self._random)
+
+    def _is_running(self) -> bool:
+        return self._is_receiving_running
+
+    def _receive(self):
+        if self._is_streaming:
+            if run_process_while(self._create_stream_process(time), self._connection.receive_send,
+                                 self._is_running, self._linger_time) is None:
+                self._connection.ack(-1)
+        else:
+            self._put_message(self._receiver(self._transmission_error_probability, self._connection,
+                                             self._segment_size, self._ack_every, self._ack_delay,
+                                             self._receive_window, self._random))
+
     def _run_receiving(self):
         while self._is_receiving_running:
-            if self._connection.not_empty_send():
-                bytes_ = self._receiver(0.3, self._connection)
-                message = pickle.loads(bytes_)
-                self._received_messages.put(message)
+            if self._connection.wait_send(self._wait_time):
+                try:
+                    self._receive()
+                except Exception:
+                    _LOGGER.exception('failed to receive a transfer')
+
+    @property
+    def metrics(self) -> LinkMetrics:
+        return self._connection.metrics
 
     def start_receiving(self):
         self._received_messages = Queue()
@@ -35,6 +112,10 @@ class LinkInput:
     def stop_receiving(self):
         self._is_receiving_running = False
         self._receiving_thread.join()
+        self.close()
+
+    def close(self):
+        self._connection.close()
 
     def not_empty(self) -> bool:
         return not self._received_messages.empty()
@@ -46,24 +127,91 @@ class LinkInput:
 class LinkOutput:
     _connection: Connection
     _sender: SenderT
+    _stream_sender_process: StreamSenderProcessT
+    _segment_size: int
+    _rtt_estimator: RttEstimator
+    _congestion_window: Optional[CongestionWindow]
+    _is_streaming: bool
+    _stream: Optional[SendStream]
     _messages_to_send: Queue
     _is_sending_running: bool
     _sending_thread: Thread
+    _window_size: int = 25
+    _max_fin_retransmissions: int = 1
+    _wait_time: float = 0.1
 
-    def __init__(self, connection: Connection, protocol: ProtocolT = 'selective_repeat'):
+    def __init__(self, connection: Connection, protocol: ProtocolT = 'selective_repeat',
+                 segment_size: int = SEGMENT_SIZE, adaptive_window: bool = False, is_streaming: bool = True):
         self._connection = connection
         self._sender = SENDER[protocol]
+        self._stream_sender_process = STREAM_SENDER_PROCESS[protocol]
+        self._segment_size = segment_size
+        self._rtt_estimator = RttEstimator()
+        self._congestion_window = CongestionWindow(self._window_size) if adaptive_window else None
+        self._is_streaming = is_streaming
+        self._stream = None
         self._is_sending_running = True
 
+    def _encode(self, message: Message) -> bytes:
+        self._connection.metrics.queue_depth.observe(self._messages_to_send.qsize() + 1)
+        self._connection.metrics.sent_messages += 1
+        return encode_message(message)
+
+    def _write(self, message: Message):
+        bytes_ = self._encode(message)
+        self._stream.write(FRAME_HEADER.pack(len(bytes_)))
+        self._stream.write(bytes_)
+
+    def _write_pending(self):
+        while True:
+            try:
+                self._write(self._messages_to_send.get_nowait())
+            except Empty:
+                break
+        if not self._is_sending_running:
+            self._stream.close()
+
+    def _wait_message(self):
+        while self._is_sending_running:
+            try:
+                self._write(self._messages_to_send.get(timeout=self._wait_time))
+                break
+            except Empty:
+                continue
+        self._write_pending()
+
+    def _receive_ack(self, timeout: Optional[float]) -> Optional[Ack]:
+        if timeout is None:
+            self._wait_message()
+            return None
+        self._write_pending()
+        return self._connection.receive_ack(timeout)
+
+    def _create_stream_process(self, message: Message, clock: ClockT) -> ProcessT[SenderResult]:
+        self._stream = SendStream(self._segment_size)
+        self._write(message)
+        return self._stream_sender_process(self._stream, self._window_size, self._connection, self._rtt_estimator,
+                                           self._congestion_window, clock, self._max_fin_retransmissions)
+
     def _run_sending(self):
         while self._is_sending_running:
-            if not self._messages_to_send.empty():
-                message = self._messages_to_send.get()
-                bytes_ = pickle.dumps(message)
-                self._sender(bytes_, 25, self._connection)
+            try:
+                message = self._messages_to_send.get(timeout=self._wait_time)
+            except Empty:
+                continue
+            if self._is_streaming:
+                run_process(self._create_stream_process(message, time), self._receive_ack)
+            else:
+                self._sender(self._encode(message), self._window_size, self._connection, self._segment_size,
+                             self._rtt_estimator, self._congestion_window)
+
+    @property
+    def metrics(self) -> LinkMetrics:
+        return self._connection.metrics
 
     def start_sending(self):
         self._messages_to_send = Queue()
+        self._stream = None
         self._is_sending_running = True
         self._sending_thread = Thread(target=self._run_sending)
         self._sending_thread.start()
@@ -71,16 +219,129 @@ class LinkOutput:
     def stop_sending(self):
         self._is_sending_running = False
         self._sending_thread.join()
+        self.close()
+
+    def close(self):
+        self._connection.close()
 
     def not_empty(self) -> bool:
-        return not self._messages_to_send.empty()
+        return not self._messages_to_send.empty() or self._stream is not None and not self._stream.is_empty
 
     def send(self, message: Message):
         self._messages_to_send.put(message)
 
 
-def get_link(protocol: ProtocolT = 'selective_repeat') -> Tuple[LinkOutput, LinkInput]:
-    connection = Connection()
-    link_output = LinkOutput(connection, protocol)
-    link_input = LinkInput(connection, protocol)
+class AsyncLinkInput(LinkInput):
+    _receiver_process: ReceiverProcessT
+    _receiving_task: asyncio.Task
+
+    def __init__(self, connection: Connection, protocol: ProtocolT = 'selective_repeat',
+                 segment_size: int = SEGMENT_SIZE, ack_every: int = 1, ack_delay: float = 0.005,
+                 receive_window: int = 0, is_streaming: bool = True, transmission_error_probability: float = 0.3,
+                 seed: Optional[int] = None):
+        super().__init__(connection, protocol, segment_size, ack_every, ack_delay, receive_window, is_streaming,
+                         transmission_error_probability, seed)
+        self._receiver_process = RECEIVER_PROCESS[protocol]
+
+    async def _receive_async(self, fileno: int):
+        if self._is_streaming:
+            if await run_process_while_async(self._create_stream_process(time), self._connection.receive_send,
+                                             fileno, self._is_running, self._linger_time) is None:
+                self._connection.ack(-1)
+        else:
+            receiver = self._receiver_process(self._transmission_error_probability, self._connection,
+                                              self._segment_size, self._ack_every, self._ack_delay,
+                                              self._receive_window, time, self._random)
+            self._put_message(await run_process_async(receiver, self._connection.receive_send, fileno))
+
+    async def _run_receiving_async(self):
+        fileno = self._connection.send_fileno()
+        while self._is_receiving_running:
+            if self._connection.wait_send(0):
+                try:
+                    await self._receive_async(fileno)
+                except Exception:
+                    _LOGGER.exception('failed to receive a transfer')
+            else:
+                await wait_readable_async(fileno, self._wait_time)
+
+    def start_receiving(self):
+        self._received_messages = Queue()
+        self._is_receiving_running = True
+        self._receiving_task = asyncio.create_task(self._run_receiving_async())
+
+    def stop_receiving(self):
+        self._is_receiving_running = False
+
+    async def join(self):
+        await self._receiving_task
+        self.close()
+
+
+class AsyncLinkOutput(LinkOutput):
+    _sender_process: SenderProcessT
+    _message_event: asyncio.Event
+    _sending_task: asyncio.Task
+
+    def __init__(self, connection: Connection, protocol: ProtocolT = 'selective_repeat',
+                 segment_size: int = SEGMENT_SIZE, adaptive_window: bool = False, is_streaming: bool = True):
+        super().__init__(connection, protocol, segment_size, adaptive_window, is_streaming)
+        self._sender_process = SENDER_PROCESS[protocol]
+
+    async def _wait_message_async(self):
+        while self._is_sending_running and self._messages_to_send.empty():
+            self._message_event.clear()
+            await self._message_event.wait()
+        self._write_pending()
+
+    async def _run_sending_async(self):
+        while self._is_sending_running:
+            try:
+                message = self._messages_to_send.get_nowait()
+            except Empty:
+                self._message_event.clear()
+                await self._message_event.wait()
+                continue
+            if self._is_streaming:
+                await run_process_async(self._create_stream_process(message, time), self._receive_ack,
+                                        self._connection.ack_fileno(), self._wait_message_async)
+            else:
+                sender = self._sender_process(self._encode(message), self._window_size, self._connection,
+                                              self._segment_size, self._rtt_estimator, self._congestion_window, time)
+                await run_process_async(sender, self._connection.receive_ack, self._connection.ack_fileno())
+
+    def start_sending(self):
+        self._messages_to_send = Queue()
+        self._message_event = asyncio.Event()
+        self._stream = None
+        self._is_sending_running = True
+        self._sending_task = asyncio.create_task(self._run_sending_async())
+
+    def stop_sending(self):
+        self._is_sending_running = False
+        self._message_event.set()
+
+    async def join(self):
+        await self._sending_task
+        self.close()
+
+    def send(self, message: Message):
+        super().send(message)
+        self._message_event.set()
+
+
+def get_link(protocol: ProtocolT = 'selective_repeat', segment_size: int = SEGMENT_SIZE,
+             connection_type: ConnectionTypeT = 'queue', ack_every: int = 1, ack_delay: float = 0.005,
+             adaptive_window: bool = False, receive_window: int = 0,
+             is_streaming: bool = True, transmission_error_probability: float = 0.3,
+             data_channel: Optional[Channel] = None, ack_channel: Optional[Channel] = None,
+             seed: Optional[int] = None, is_async: bool = False) -> Tuple[LinkOutput, LinkInput]:
+    connection = CONNECTION[connection_type](segment_size)
+    if data_channel is not None or ack_channel is not None:
+        connection = ChannelConnection(connection, data_channel, ack_channel)
+    link_output_type = AsyncLinkOutput if is_async else LinkOutput
+    link_input_type = AsyncLinkInput if is_async else LinkInput
+    link_output = link_output_type(connection, protocol, segment_size, adaptive_window, is_streaming)
+    link_input = link_input_type(connection, protocol, segment_size, ack_every, ack_delay, receive_window, is_streaming,
+                                 transmission_error_probability, seed)
     return link_output, link_input
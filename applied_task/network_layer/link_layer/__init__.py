@@ -1,2 +1,15 @@
-from .link import Connection, ProtocolT, RECEIVER, ReceiverT, SENDER, SenderT
-from .packet import Packet
+from .channel import BernoulliLoss, Channel, ChannelConnection, GilbertElliottLoss, LossModel
+from .codec import decode_ack, decode_packet, encode_ack, encode_packet
+from .congestion_window import CongestionWindow
+from .link import (CONNECTION, Connection, ConnectionFactoryT, ConnectionTypeT, ProtocolT, QueueConnection, RECEIVER,
+                   RECEIVER_PROCESS, ReceiverProcessT, ReceiverT, SENDER, SENDER_PROCESS, SenderProcessT, SenderT,
+                   STREAM_RECEIVER_PROCESS, STREAM_SENDER_PROCESS, StreamReceiverProcessT, StreamSenderProcessT)
+from .link_metrics import Histogram, LinkMetrics
+from .packet import Ack, Packet, SACK_SIZE
+from .process import (ClockT, ProcessT, run_process, run_process_async, run_process_while, run_process_while_async,
+                      sleep_process_async, wait_readable_async)
+from .rtt_estimator import RttEstimator
+from .send_stream import SendStream
+from .sender_result import SenderResult
+from .shared_memory_connection import SharedMemoryConnection
+from .simulator import SimulatedConnection, simulate, Simulator
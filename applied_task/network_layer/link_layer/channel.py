@@ -0,0 +1,183 @@
+import os
+
+from .connection import Connection
+from .packet import Ack, Packet
+from heapq import heappop, heappush
+from random import Random
+from threading import Condition, Thread
+from time import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from weakref import WeakSet
+
+
+class LossModel:
+    def is_lost(self, random_: Random) -> bool:
+        return False
+
+
+class BernoulliLoss(LossModel):
+    _probability: float
+
+    def __init__(self, probability: float):
+        self._probability = probability
+
+    def is_lost(self, random_: Random) -> bool:
+        return random_.random() < self._probability
+
+
+class GilbertElliottLoss(LossModel):
+    _good_to_bad_probability: float
+    _bad_to_good_probability: float
+    _good_loss_probability: float
+    _bad_loss_probability: float
+    _is_bad: bool
+
+    def __init__(self, good_to_bad_probability: float, bad_to_good_probability: float,
+                 good_loss_probability: float = 0, bad_loss_probability: float = 1):
+        self._good_to_bad_probability = good_to_bad_probability
+        self._bad_to_good_probability = bad_to_good_probability
+        self._good_loss_probability = good_loss_probability
+        self._bad_loss_probability = bad_loss_probability
+        self._is_bad = False
+
+    def is_lost(self, random_: Random) -> bool:
+        if random_.random() < (self._bad_to_good_probability if self._is_bad else self._good_to_bad_probability):
+            self._is_bad = not self._is_bad
+        return random_.random() < (self._bad_loss_probability if self._is_bad else self._good_loss_probability)
+
+
+class Channel:
+    _loss: LossModel
+    _delay: float
+    _jitter: float
+    _duplication_probability: float
+    _reordering_probability: float
+    _reordering_delay: float
+    _random: Random
+
+    def __init__(self, loss: Optional[LossModel] = None, delay: float = 0, jitter: float = 0,
+                 duplication_probability: float = 0, reordering_probability: float = 0,
+                 reordering_delay: float = 0.01, seed: Optional[int] = None):
+        self._loss = loss if loss is not None else LossModel()
+        self._delay = delay
+        self._jitter = jitter
+        self._duplication_probability = duplication_probability
+        self._reordering_probability = reordering_probability
+        self._reordering_delay = reordering_delay
+        self._random = Random(seed)
+
+    def transmit(self) -> List[float]:
+        if self._loss.is_lost(self._random):
+            return []
+        copies_count = 2 if self._random.random() < self._duplication_probability else 1
+        delays = []
+        for _ in range(copies_count):
+            delay = self._delay + self._random.uniform(0, self._jitter)
+            if self._random.random() < self._reordering_probability:
+                delay += self._reordering_delay
+            delays.append(delay)
+        return delays
+
+
+class ChannelConnection(Connection):
+    _connection: Connection
+    _data_channel: Channel
+    _ack_channel: Channel
+    _scheduled: List[Tuple[float, int, Callable[[Any], None], Any]]
+    _scheduled_count: int
+    _scheduler_condition: Condition
+    _scheduler_thread: Optional[Thread]
+    _is_closed: bool
+
+    def __init__(self, connection: Connection, data_channel: Optional[Channel] = None,
+                 ack_channel: Optional[Channel] = None):
+        super().__init__()
+        self._connection = connection
+        self._data_channel = data_channel if data_channel is not None else Channel()
+        self._ack_channel = ack_channel if ack_channel is not None else Channel()
+        self._reset_scheduler()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for name in ('_scheduled', '_scheduled_count', '_scheduler_condition', '_scheduler_thread', '_is_closed'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._reset_scheduler()
+
+    def _reset_scheduler(self):
+        self._scheduled = []
+        self._scheduled_count = 0
+        self._scheduler_condition = Condition()
+        self._scheduler_thread = None
+        self._is_closed = False
+        _CHANNEL_CONNECTIONS.add(self)
+
+    def _run_scheduler(self):
+        while True:
+            with self._scheduler_condition:
+                while not self._is_closed and (len(self._scheduled) == 0 or self._scheduled[0][0] > time()):
+                    self._scheduler_condition.wait(self._scheduled[0][0] - time() if self._scheduled else None)
+                if self._is_closed:
+                    return
+                _, _, put, item = heappop(self._scheduled)
+            put(item)
+
+    def _transmit(self, channel: Channel, put: Callable[[Any], None], item: Any):
+        current = time()
+        with self._scheduler_condition:
+            if self._is_closed:
+                return
+            for delay in channel.transmit():
+                heappush(self._scheduled, (current + delay, self._scheduled_count, put, item))
+                self._scheduled_count += 1
+            if self._scheduler_thread is None:
+                self._scheduler_thread = Thread(target=self._run_scheduler, daemon=True)
+                self._scheduler_thread.start()
+            self._scheduler_condition.notify()
+
+    def _has_packets(self) -> bool:
+        return self._connection._has_packets()
+
+    def _put_packet(self, packet: Packet):
+        self._transmit(self._data_channel, self._connection._put_packet, packet)
+
+    def _put_ack(self, ack: Ack):
+        self._transmit(self._ack_channel, self._connection._put_ack, ack)
+
+    def _receive_packet(self, timeout: Optional[float]) -> Optional[Packet]:
+        return self._connection._receive_packet(timeout)
+
+    def _receive_ack(self, timeout: Optional[float]) -> Optional[Ack]:
+        return self._connection._receive_ack(timeout)
+
+    def not_empty_ack(self) -> bool:
+        return self._connection.not_empty_ack()
+
+    def send_fileno(self) -> int:
+        return self._connection.send_fileno()
+
+    def ack_fileno(self) -> int:
+        return self._connection.ack_fileno()
+
+    def close(self):
+        with self._scheduler_condition:
+            self._is_closed = True
+            self._scheduled.clear()
+            self._scheduler_condition.notify()
+        if self._scheduler_thread is not None:
+            self._scheduler_thread.join()
+        self._connection.close()
+
+
+_CHANNEL_CONNECTIONS: WeakSet = WeakSet()
+
+
+def _reset_schedulers():
+    for connection in _CHANNEL_CONNECTIONS:
+        connection._reset_scheduler()
+
+
+os.register_at_fork(after_in_child=_reset_schedulers)
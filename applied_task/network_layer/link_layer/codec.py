@@ -0,0 +1,23 @@
+from .packet import Ack, Packet
+from struct import Struct
+
+
+PACKET_HEADER = Struct('<qQQ')
+ACK = Struct('<qQ?iQ')
+
+
+def encode_packet(packet: Packet) -> bytes:
+    return PACKET_HEADER.pack(packet.id, packet.total_size, packet.transfer_id) + packet.data
+
+
+def decode_packet(bytes_: bytes) -> Packet:
+    packet_id, total_size, transfer_id = PACKET_HEADER.unpack_from(bytes_)
+    return Packet(packet_id, bytes_[PACKET_HEADER.size:], total_size, transfer_id)
+
+
+def encode_ack(ack: Ack) -> bytes:
+    return ACK.pack(ack.id, ack.sack, ack.is_cumulative, ack.receive_window, ack.transfer_id)
+
+
+def decode_ack(bytes_: bytes) -> Ack:
+    return Ack(*ACK.unpack(bytes_))
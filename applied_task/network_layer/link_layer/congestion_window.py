@@ -0,0 +1,32 @@
+from typing import Optional
+
+
+class CongestionWindow:
+    _window: float
+    _threshold: float
+    _max_window: int
+    _decrease: float = 0.5
+
+    def __init__(self, max_window: int, initial_window: int = 1, threshold: Optional[float] = None):
+        self._window = initial_window
+        self._threshold = max_window if threshold is None else threshold
+        self._max_window = max_window
+
+    @property
+    def size(self) -> int:
+        return max(1, min(int(self._window), self._max_window))
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    def on_ack(self, acked_packets: int):
+        if self._window < self._threshold:
+            self._window += acked_packets
+        else:
+            self._window += acked_packets / self._window
+        self._window = min(self._window, self._max_window)
+
+    def on_loss(self):
+        self._threshold = max(self._window * self._decrease, 1)
+        self._window = self._threshold
@@ -1,34 +1,176 @@
-from .packet import Packet
+from .codec import decode_ack, decode_packet, encode_ack, encode_packet
+from .link_metrics import LinkMetrics
+from .notifier import Notifier
+from .packet import Ack, Packet
 from multiprocessing import Queue
-from typing import Iterable
+from queue import Empty
+from time import time
+from typing import Iterable, Optional
 
 
 class Connection:
-    _queue_to_send: Queue
-    _queue_to_ack: Queue
+    _pending_packet: Optional[Packet]
+    _metrics: LinkMetrics
+    _send_transfer_id: int = 0
+    _receive_transfer_id: int = 0
 
     def __init__(self):
-        self._queue_to_send = Queue()
-        self._queue_to_ack = Queue()
+        self._pending_packet = None
+        self._metrics = LinkMetrics()
+
+    def _has_packets(self) -> bool:
+        raise NotImplementedError
+
+    def _put_packet(self, packet: Packet):
+        raise NotImplementedError
+
+    def _put_ack(self, ack: Ack):
+        raise NotImplementedError
+
+    def _receive_packet(self, timeout: Optional[float]) -> Optional[Packet]:
+        raise NotImplementedError
+
+    def _receive_ack(self, timeout: Optional[float]) -> Optional[Ack]:
+        raise NotImplementedError
+
+    def _receive_accepted_packet(self, timeout: Optional[float]) -> Optional[Packet]:
+        deadline = None if timeout is None else time() + timeout
+        while True:
+            packet = self._receive_packet(None if deadline is None else deadline - time())
+            if packet is None or self.accept_packet(packet):
+                return packet
+
+    @property
+    def metrics(self) -> LinkMetrics:
+        return self._metrics
+
+    def accept_packet(self, packet: Packet) -> bool:
+        if packet.transfer_id == self._receive_transfer_id:
+            self._metrics.received_packets += 1
+            self._metrics.received_bytes += len(packet.data)
+            return True
+        self._metrics.stale_packets += 1
+        if packet.id == -1:
+            self._put_ack(Ack(-1, transfer_id=packet.transfer_id))
+        return False
+
+    def accept_ack(self, ack: Ack) -> bool:
+        if ack.transfer_id != self._send_transfer_id:
+            self._metrics.stale_acks += 1
+            return False
+        self._metrics.received_acks += 1
+        if ack.id == -1 and not ack.is_cumulative:
+            self._send_transfer_id += 1
+            self._metrics.sent_transfers += 1
+        return True
 
     def send(self, packet: Packet):
-        self._queue_to_send.put(packet)
+        packet.transfer_id = self._send_transfer_id
+        self._metrics.sent_packets += 1
+        self._metrics.sent_bytes += len(packet.data)
+        self._put_packet(packet)
 
     def send_packets(self, packets: Iterable[Packet]):
         for packet in packets:
-            self._queue_to_send.put(packet)
+            self.send(packet)
 
-    def ack(self, packet_id: int):
-        self._queue_to_ack.put(packet_id)
+    def ack(self, packet_id: int, receive_window: int = 0):
+        self._put_ack(Ack(packet_id, receive_window=receive_window, transfer_id=self._receive_transfer_id))
+        self._metrics.sent_acks += 1
+        if packet_id == -1:
+            self._receive_transfer_id += 1
+            self._metrics.received_transfers += 1
+
+    def ack_cumulative(self, packet_id: int, sack: int = 0, receive_window: int = 0):
+        self._metrics.sent_acks += 1
+        self._put_ack(Ack(packet_id, sack, True, receive_window, self._receive_transfer_id))
 
     def not_empty_send(self) -> bool:
+        return self._pending_packet is not None or self._has_packets()
+
+    def not_empty_ack(self) -> bool:
+        raise NotImplementedError
+
+    def send_fileno(self) -> int:
+        raise NotImplementedError
+
+    def ack_fileno(self) -> int:
+        raise NotImplementedError
+
+    def wait_send(self, timeout: Optional[float] = None) -> bool:
+        if self._pending_packet is None:
+            self._pending_packet = self._receive_accepted_packet(timeout)
+        return self._pending_packet is not None
+
+    def receive_send(self, timeout: Optional[float] = None) -> Optional[Packet]:
+        if self._pending_packet is not None:
+            packet, self._pending_packet = self._pending_packet, None
+            return packet
+        return self._receive_accepted_packet(timeout)
+
+    def receive_ack(self, timeout: Optional[float] = None) -> Optional[Ack]:
+        deadline = None if timeout is None else time() + timeout
+        while True:
+            ack = self._receive_ack(None if deadline is None else deadline - time())
+            if ack is None or self.accept_ack(ack):
+                return ack
+
+    def close(self):
+        pass
+
+
+class QueueConnection(Connection):
+    _queue_to_send: Queue
+    _queue_to_ack: Queue
+    _send_notifier: Notifier
+    _ack_notifier: Notifier
+
+    def __init__(self):
+        super().__init__()
+        self._queue_to_send = Queue()
+        self._queue_to_ack = Queue()
+        self._send_notifier = Notifier()
+        self._ack_notifier = Notifier()
+
+    @staticmethod
+    def _get(queue: Queue, notifier: Notifier, timeout: Optional[float]):
+        try:
+            item = queue.get(timeout=None if timeout is None else max(timeout, 0))
+        except Empty:
+            return None
+        notifier.consume()
+        return item
+
+    def _has_packets(self) -> bool:
         return not self._queue_to_send.empty()
 
+    def _put_packet(self, packet: Packet):
+        self._send_notifier.notify()
+        self._queue_to_send.put(encode_packet(packet))
+
+    def _put_ack(self, ack: Ack):
+        self._ack_notifier.notify()
+        self._queue_to_ack.put(encode_ack(ack))
+
+    def _receive_packet(self, timeout: Optional[float]) -> Optional[Packet]:
+        bytes_ = self._get(self._queue_to_send, self._send_notifier, timeout)
+        return decode_packet(bytes_) if bytes_ is not None else None
+
+    def _receive_ack(self, timeout: Optional[float]) -> Optional[Ack]:
+        bytes_ = self._get(self._queue_to_ack, self._ack_notifier, timeout)
+        return decode_ack(bytes_) if bytes_ is not None else None
+
     def not_empty_ack(self) -> bool:
         return not self._queue_to_ack.empty()
 
-    def receive_send(self) -> Packet:
-        return self._queue_to_send.get()
+    def send_fileno(self) -> int:
+        return self._send_notifier.fileno()
+
+    def ack_fileno(self) -> int:
+        return self._ack_notifier.fileno()
 
-    def receive_ack(self) -> int:
-        return self._queue_to_ack.get()
+    def close(self):
+        self._queue_to_send.close()
+        self._queue_to_ack.close()
+        self._send_notifier.close()
+        self._ack_notifier.close()
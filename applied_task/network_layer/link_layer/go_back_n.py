@@ -1,63 +1,164 @@
+from .congestion_window import CongestionWindow
 from .connection import Connection
 from .packet import Packet
-from random import random
+from .process import ClockT, finish_process, ProcessT, run_process
+from .rtt_estimator import RttEstimator
+from .send_stream import SendStream
+from .sender_result import SenderResult
+from random import random, Random
 from time import time
+from typing import Any, Callable, Dict, List, Optional
 
 
-def sender(bytes_to_send: bytes, window_size: int, connection: Connection) -> int:
-    timeout = 0.2
-    strong_timeout = 10
+def stream_sender_process(stream: SendStream, window_size: int, connection: Connection,
+                          rtt_estimator: Optional[RttEstimator] = None,
+                          congestion_window: Optional[CongestionWindow] = None, clock: ClockT = time,
+                          max_fin_retransmissions: Optional[int] = None) -> ProcessT[SenderResult]:
+    if rtt_estimator is None:
+        rtt_estimator = RttEstimator()
+    metrics = connection.metrics
+    transfer_start = clock()
     last_acked_packet_id = -1
-    packets_count_to_send = len(bytes_to_send)
-
-    last_sent_packet_id = min(window_size, packets_count_to_send) - 1
-    connection.send_packets((Packet(i, bytes_to_send[i:i + 1]) for i in range(last_sent_packet_id + 1)))
-    start = time()
-    sent_packets = last_sent_packet_id + 1
-
-    while not connection.not_empty_ack():
-        if time() - start > strong_timeout:
-            connection.send_packets((Packet(i, bytes_to_send[i:i + 1]) for i in range(last_sent_packet_id + 1)))
-            start = time()
-            sent_packets += last_sent_packet_id + 1
-
-    while last_acked_packet_id < packets_count_to_send - 1:
-        if connection.not_empty_ack():
-            packet_id = connection.receive_ack()
-            if packet_id == last_acked_packet_id + 1:
-                last_acked_packet_id += 1
-                if last_sent_packet_id < packets_count_to_send - 1:
-                    last_sent_packet_id += 1
-                    sent_packets += 1
-                    connection.send(Packet(last_sent_packet_id,
-                                           bytes_to_send[last_sent_packet_id:last_sent_packet_id + 1]))
-                start = time()
-
-        if time() - start > timeout:
+    last_sent_packet_id = -1
+    sent_times: Dict[int, Optional[float]] = {}
+    receive_window = 0
+    sent_packets = 0
+    retransmissions = 0
+
+    def current_window_size() -> int:
+        size = window_size if congestion_window is None else min(window_size, congestion_window.size)
+        return size if receive_window <= 0 else max(min(size, receive_window), 1)
+
+    def send_new_packets():
+        nonlocal last_sent_packet_id, sent_packets
+        while (last_sent_packet_id < last_acked_packet_id + current_window_size() and
+               (last_sent_packet_id < stream.packets_count - 1 or stream.seal())):
+            last_sent_packet_id += 1
+            sent_packets += 1
+            connection.send(stream.packet(last_sent_packet_id))
+            sent_times[last_sent_packet_id] = clock()
+
+    send_new_packets()
+    deadline = clock() + rtt_estimator.rto
+
+    while True:
+        if last_acked_packet_id == stream.packets_count - 1 and not stream.has_pending:
+            if stream.is_closed:
+                break
+            yield None
+            send_new_packets()
+            deadline = clock() + rtt_estimator.rto
+            continue
+
+        ack = yield deadline - clock()
+        if ack is None:
+            rtt_estimator.back_off()
+            if congestion_window is not None:
+                congestion_window.on_loss()
             packet_id = last_acked_packet_id + 1
-            last_sent_packet_id = min(packet_id + window_size, packets_count_to_send) - 1
-            connection.send_packets((Packet(i, bytes_to_send[i:i + 1])
-                                     for i in range(packet_id, last_sent_packet_id + 1)))
+            last_sent_packet_id = min(packet_id + current_window_size(), stream.packets_count) - 1
+            connection.send_packets((stream.packet(i) for i in range(packet_id, last_sent_packet_id + 1)))
+            sent_times.update(dict.fromkeys(range(packet_id, last_sent_packet_id + 1)))
             sent_packets += last_sent_packet_id - packet_id + 1
-            start = time()
+            retransmissions += last_sent_packet_id - packet_id + 1
+            metrics.timeout_retransmissions += last_sent_packet_id - packet_id + 1
+            deadline = clock() + rtt_estimator.rto
+        elif last_acked_packet_id < ack.id < stream.packets_count:
+            current = clock()
+            metrics.window_occupancy.observe(last_sent_packet_id - last_acked_packet_id)
+            if ack.receive_window > 0:
+                receive_window = ack.receive_window
+            if congestion_window is not None:
+                congestion_window.on_ack(ack.id - last_acked_packet_id)
+            sent_time = sent_times.get(ack.id)
+            if sent_time is not None:
+                rtt_estimator.sample(current - sent_time)
+                metrics.ack_latency.observe(current - sent_time)
+            else:
+                rtt_estimator.reset_backoff()
+            for packet_id in range(last_acked_packet_id + 1, ack.id + 1):
+                sent_times.pop(packet_id, None)
+                stream.release(packet_id)
+            last_acked_packet_id = ack.id
+            last_sent_packet_id = max(last_sent_packet_id, last_acked_packet_id)
+            send_new_packets()
+            deadline = current + rtt_estimator.rto
 
-    connection.send(Packet(-1, b''))
-    return sent_packets
+    yield from finish_process(connection, rtt_estimator, max_fin_retransmissions)
+    metrics.transfer_time.observe(clock() - transfer_start)
+    return SenderResult(sent_packets, retransmissions, rtt_estimator.srtt)
 
 
-def receiver(transmission_error_probability: float, connection: Connection) -> bytes:
-    last_acked_packet_id = -1
-    bytes_ = b''
+def sender_process(bytes_to_send: bytes, window_size: int, connection: Connection, segment_size: int = 1,
+                   rtt_estimator: Optional[RttEstimator] = None, congestion_window: Optional[CongestionWindow] = None,
+                   clock: ClockT = time) -> ProcessT[SenderResult]:
+    return (yield from stream_sender_process(SendStream.from_bytes(bytes_to_send, segment_size), window_size,
+                                             connection, rtt_estimator, congestion_window, clock))
+
+
+def sender(bytes_to_send: bytes, window_size: int, connection: Connection, segment_size: int = 1,
+           rtt_estimator: Optional[RttEstimator] = None,
+           congestion_window: Optional[CongestionWindow] = None) -> SenderResult:
+    return run_process(sender_process(bytes_to_send, window_size, connection, segment_size, rtt_estimator,
+                                      congestion_window), connection.receive_ack)
+
+
+def stream_receiver_process(transmission_error_probability: float, connection: Connection,
+                            deliver: Callable[[bytes], Any], segment_size: int = 1, ack_every: int = 1,
+                            ack_delay: float = 0.005, receive_window: int = 0, clock: ClockT = time,
+                            random_generator: Optional[Random] = None) -> ProcessT[int]:
+    random_ = random if random_generator is None else random_generator.random
+    metrics = connection.metrics
+    last_received_packet_id = -1
+    unacked_packets = 0
+    ack_deadline = None
 
     while True:
-        if connection.not_empty_send():
-            packet: Packet = connection.receive_send()
+        packet: Optional[Packet] = yield None if ack_deadline is None else ack_deadline - clock()
+        if packet is not None:
             if packet.id == -1:
+                connection.ack(-1)
                 break
 
-            if packet.id == last_acked_packet_id + 1 and random() > transmission_error_probability:
-                last_acked_packet_id += 1
-                connection.ack(packet.id)
-                bytes_ += packet.data
+            if random_() > transmission_error_probability:
+                if packet.id == last_received_packet_id + 1:
+                    last_received_packet_id += 1
+                    deliver(packet.data)
+                    if ack_every == 1:
+                        connection.ack(packet.id, receive_window)
+                    else:
+                        unacked_packets += 1
+                        if ack_deadline is None:
+                            ack_deadline = clock() + ack_delay
+                elif last_received_packet_id >= 0:
+                    if packet.id <= last_received_packet_id:
+                        metrics.duplicate_packets += 1
+                    if ack_every == 1:
+                        connection.ack(last_received_packet_id, receive_window)
+                    else:
+                        unacked_packets = ack_every
+            else:
+                metrics.dropped_packets += 1
+
+        if unacked_packets > 0 and (packet is None or unacked_packets >= ack_every):
+            connection.ack_cumulative(last_received_packet_id, receive_window=receive_window)
+            unacked_packets = 0
+            ack_deadline = None
+
+    return last_received_packet_id + 1
+
+
+def receiver_process(transmission_error_probability: float, connection: Connection, segment_size: int = 1,
+                     ack_every: int = 1, ack_delay: float = 0.005, receive_window: int = 0,
+                     clock: ClockT = time, random_generator: Optional[Random] = None) -> ProcessT[bytes]:
+    segments: List[bytes] = []
+    yield from stream_receiver_process(transmission_error_probability, connection, segments.append, segment_size,
+                                       ack_every, ack_delay, receive_window, clock, random_generator)
+    return b''.join(segments)
+
 
-    return bytes_
+def receiver(transmission_error_probability: float, connection: Connection, segment_size: int = 1,
+             ack_every: int = 1, ack_delay: float = 0.005, receive_window: int = 0,
+             random_generator: Optional[Random] = None) -> bytes:
+    return run_process(receiver_process(transmission_error_probability, connection, segment_size, ack_every, ack_delay,
+                                        receive_window, time, random_generator), connection.receive_send)
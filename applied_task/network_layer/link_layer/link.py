@@ -1,12 +1,35 @@
-from .connection import Connection
-from .go_back_n import receiver as go_back_n_receiver, sender as go_back_n_sender
-from .selective_repeat import receiver as selective_repeat_receiver, sender as selective_repeat_sender
-from typing import Callable, Dict, Literal
+from .congestion_window import CongestionWindow
+from .connection import Connection, QueueConnection
+from .go_back_n import (receiver as go_back_n_receiver, receiver_process as go_back_n_receiver_process,
+                        sender as go_back_n_sender, sender_process as go_back_n_sender_process,
+                        stream_receiver_process as go_back_n_stream_receiver_process,
+                        stream_sender_process as go_back_n_stream_sender_process)
+from .process import ClockT, ProcessT
+from .rtt_estimator import RttEstimator
+from .selective_repeat import (receiver as selective_repeat_receiver,
+                               receiver_process as selective_repeat_receiver_process,
+                               sender as selective_repeat_sender, sender_process as selective_repeat_sender_process,
+                               stream_receiver_process as selective_repeat_stream_receiver_process,
+                               stream_sender_process as selective_repeat_stream_sender_process)
+from .send_stream import SendStream
+from .sender_result import SenderResult
+from .shared_memory_connection import SharedMemoryConnection
+from random import Random
+from typing import Any, Callable, Dict, Literal, Optional
 
 
 ProtocolT = Literal['go_back_n', 'selective_repeat']
-SenderT = Callable[[bytes, int, Connection], int]
-ReceiverT = Callable[[float, Connection], bytes]
+SenderT = Callable[[bytes, int, Connection, int, Optional[RttEstimator], Optional[CongestionWindow]], SenderResult]
+ReceiverT = Callable[[float, Connection, int, int, float, int, Optional[Random]], bytes]
+SenderProcessT = Callable[[bytes, int, Connection, int, Optional[RttEstimator], Optional[CongestionWindow], ClockT],
+                          ProcessT[SenderResult]]
+ReceiverProcessT = Callable[[float, Connection, int, int, float, int, ClockT, Optional[Random]], ProcessT[bytes]]
+StreamSenderProcessT = Callable[[SendStream, int, Connection, Optional[RttEstimator], Optional[CongestionWindow],
+                                 ClockT, Optional[int]], ProcessT[SenderResult]]
+StreamReceiverProcessT = Callable[[float, Connection, Callable[[bytes], Any], int, int, float, int, ClockT,
+                                   Optional[Random]], ProcessT[int]]
+ConnectionTypeT = Literal['queue', 'shared_memory']
+ConnectionFactoryT = Callable[[int], Connection]
 
 SENDER: Dict[ProtocolT, SenderT] = {
     'go_back_n': go_back_n_sender,
@@ -17,3 +40,28 @@ RECEIVER: Dict[ProtocolT, ReceiverT] = {
     'go_back_n': go_back_n_receiver,
     'selective_repeat': selective_repeat_receiver
 }
+
+SENDER_PROCESS: Dict[ProtocolT, SenderProcessT] = {
+    'go_back_n': go_back_n_sender_process,
+    'selective_repeat': selective_repeat_sender_process
+}
+
+RECEIVER_PROCESS: Dict[ProtocolT, ReceiverProcessT] = {
+    'go_back_n': go_back_n_receiver_process,
+    'selective_repeat': selective_repeat_receiver_process
+}
+
+STREAM_SENDER_PROCESS: Dict[ProtocolT, StreamSenderProcessT] = {
+    'go_back_n': go_back_n_stream_sender_process,
+    'selective_repeat': selective_repeat_stream_sender_process
+}
+
+STREAM_RECEIVER_PROCESS: Dict[ProtocolT, StreamReceiverProcessT] = {
+    'go_back_n': go_back_n_stream_receiver_process,
+    'selective_repeat': selective_repeat_stream_receiver_process
+}
+
+CONNECTION: Dict[ConnectionTypeT, ConnectionFactoryT] = {
+    'queue': lambda segment_size: QueueConnection(),
+    'shared_memory': SharedMemoryConnection
+}
@@ -0,0 +1,138 @@
+from bisect import bisect_left
+from csv import DictWriter
+from io import StringIO
+from typing import Dict, List, Optional, Tuple
+
+
+TIME_BOUNDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+SIZE_BOUNDS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _braces(labels: str) -> str:
+    return f'{{{labels}}}' if labels else ''
+
+
+class Histogram:
+    _bounds: Tuple[float, ...]
+    _counts: List[int]
+    _sum: float
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def observe(self, value: float):
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self._sum += value
+
+    def to_dict(self, name: str) -> Dict[str, float]:
+        result = {f'{name}_count': self.count, f'{name}_sum': self._sum}
+        cumulative_count = 0
+        for bound, count in zip(self._bounds, self._counts):
+            cumulative_count += count
+            result[f'{name}_le_{bound}'] = cumulative_count
+        return result
+
+    def to_prometheus(self, name: str, labels: str) -> List[str]:
+        lines = [f'# TYPE {name} histogram']
+        cumulative_count = 0
+        for bound, count in zip(self._bounds + ('+Inf',), self._counts):
+            cumulative_count += count
+            lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative_count}')
+        lines.append(f'{name}_sum{_braces(labels)} {self._sum}')
+        lines.append(f'{name}_count{_braces(labels)} {cumulative_count}')
+        return lines
+
+
+class LinkMetrics:
+    sent_packets: int
+    sent_bytes: int
+    sent_acks: int
+    sent_transfers: int
+    sent_messages: int
+    received_packets: int
+    received_bytes: int
+    received_acks: int
+    received_transfers: int
+    received_messages: int
+    dropped_packets: int
+    duplicate_packets: int
+    stale_packets: int
+    stale_acks: int
+    timeout_retransmissions: int
+    strong_timeout_retransmissions: int
+    fast_retransmissions: int
+    fin_retransmissions: int
+    ack_latency: Histogram
+    transfer_time: Histogram
+    window_occupancy: Histogram
+    queue_depth: Histogram
+    _counters: Tuple[str, ...] = ('sent_packets', 'sent_bytes', 'sent_acks', 'sent_transfers', 'sent_messages',
+                                  'received_packets', 'received_bytes', 'received_acks', 'received_transfers',
+                                  'received_messages', 'dropped_packets', 'duplicate_packets', 'stale_packets',
+                                  'stale_acks', 'timeout_retransmissions', 'strong_timeout_retransmissions',
+                                  'fast_retransmissions', 'fin_retransmissions')
+    _histograms: Tuple[str, ...] = ('ack_latency', 'transfer_time', 'window_occupancy', 'queue_depth')
+
+    def __init__(self):
+        self.sent_packets = 0
+        self.sent_bytes = 0
+        self.sent_acks = 0
+        self.sent_transfers = 0
+        self.sent_messages = 0
+        self.received_packets = 0
+        self.received_bytes = 0
+        self.received_acks = 0
+        self.received_transfers = 0
+        self.received_messages = 0
+        self.dropped_packets = 0
+        self.duplicate_packets = 0
+        self.stale_packets = 0
+        self.stale_acks = 0
+        self.timeout_retransmissions = 0
+        self.strong_timeout_retransmissions = 0
+        self.fast_retransmissions = 0
+        self.fin_retransmissions = 0
+        self.ack_latency = Histogram(TIME_BOUNDS)
+        self.transfer_time = Histogram(TIME_BOUNDS)
+        self.window_occupancy = Histogram(SIZE_BOUNDS)
+        self.queue_depth = Histogram(SIZE_BOUNDS)
+
+    @property
+    def retransmissions(self) -> int:
+        return (self.timeout_retransmissions + self.strong_timeout_retransmissions + self.fast_retransmissions +
+                self.fin_retransmissions)
+
+    def to_dict(self) -> Dict[str, float]:
+        result: Dict[str, float] = {name: getattr(self, name) for name in self._counters}
+        for name in self._histograms:
+            result.update(getattr(self, name).to_dict(name))
+        return result
+
+    def to_csv(self, is_header: bool = True) -> str:
+        metrics = self.to_dict()
+        file = StringIO()
+        writer = DictWriter(file, list(metrics), lineterminator='\n')
+        if is_header:
+            writer.writeheader()
+        writer.writerow(metrics)
+        return file.getvalue()
+
+    def to_prometheus(self, prefix: str = 'link', labels: Optional[Dict[str, str]] = None) -> str:
+        labels_ = ','.join(f'{key}="{value}"' for key, value in (labels or {}).items())
+        lines = []
+        for name in self._counters:
+            lines.append(f'# TYPE {prefix}_{name}_total counter')
+            lines.append(f'{prefix}_{name}_total{_braces(labels_)} {getattr(self, name)}')
+        for name in self._histograms:
+            lines += getattr(self, name).to_prometheus(f'{prefix}_{name}', labels_)
+        return '\n'.join(lines) + '\n'
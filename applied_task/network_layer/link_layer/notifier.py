@@ -0,0 +1,33 @@
+import os
+
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection as PipeConnection
+
+
+class Notifier:
+    _reader: PipeConnection
+    _writer: PipeConnection
+
+    def __init__(self):
+        self._reader, self._writer = Pipe(duplex=False)
+        os.set_blocking(self._reader.fileno(), False)
+        os.set_blocking(self._writer.fileno(), False)
+
+    def fileno(self) -> int:
+        return self._reader.fileno()
+
+    def notify(self):
+        try:
+            os.write(self._writer.fileno(), b'\0')
+        except BlockingIOError:
+            pass
+
+    def consume(self):
+        try:
+            os.read(self._reader.fileno(), 1)
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        self._reader.close()
+        self._writer.close()
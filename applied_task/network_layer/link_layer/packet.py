@@ -1,7 +1,42 @@
+from typing import Iterator
+
+
+SACK_SIZE = 64
+
+
 class Packet:
     id: int
     data: bytes
+    total_size: int
+    transfer_id: int
 
-    def __init__(self, id_: int, data: bytes):
+    def __init__(self, id_: int, data: bytes, total_size: int = 0, transfer_id: int = 0):
         self.id = id_
         self.data = data
+        self.total_size = total_size
+        self.transfer_id = transfer_id
+
+
+class Ack:
+    id: int
+    sack: int
+    is_cumulative: bool
+    receive_window: int
+    transfer_id: int
+
+    def __init__(self, id_: int, sack: int = 0, is_cumulative: bool = False, receive_window: int = 0,
+                 transfer_id: int = 0):
+        self.id = id_
+        self.sack = sack
+        self.is_cumulative = is_cumulative
+        self.receive_window = receive_window
+        self.transfer_id = transfer_id
+
+    def sacked_ids(self) -> Iterator[int]:
+        sack = self.sack
+        packet_id = self.id + 1
+        while sack:
+            if sack & 1:
+                yield packet_id
+            sack >>= 1
+            packet_id += 1
@@ -0,0 +1,116 @@
+import asyncio
+
+from .connection import Connection
+from .packet import Ack, Packet
+from .rtt_estimator import RttEstimator
+from time import time
+from typing import Any, Awaitable, Callable, Generator, Optional, TypeVar
+
+
+T = TypeVar('T')
+ClockT = Callable[[], float]
+ProcessT = Generator[Optional[float], Any, T]
+
+
+def run_process(process: ProcessT[T], receive: Callable[[Optional[float]], Any]) -> T:
+    try:
+        timeout = next(process)
+        while True:
+            timeout = process.send(receive(timeout))
+    except StopIteration as stop:
+        return stop.value
+
+
+def run_process_while(process: ProcessT[T], receive: Callable[[Optional[float]], Any], is_running: Callable[[], bool],
+                      poll_time: float) -> Optional[T]:
+    try:
+        timeout = next(process)
+        while True:
+            item = receive(poll_time if timeout is None else timeout)
+            if item is None and timeout is None:
+                if not is_running():
+                    return None
+            else:
+                timeout = process.send(item)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def wait_readable_async(fileno: int, timeout: Optional[float]):
+    loop = asyncio.get_running_loop()
+    readable = loop.create_future()
+
+    def set_readable():
+        if not readable.done():
+            readable.set_result(None)
+
+    loop.add_reader(fileno, set_readable)
+    try:
+        await asyncio.wait_for(readable, timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        loop.remove_reader(fileno)
+
+
+async def run_process_async(process: ProcessT[T], receive: Callable[[Optional[float]], Any], fileno: int,
+                            wait_idle: Optional[Callable[[], Awaitable[Any]]] = None) -> T:
+    try:
+        timeout = next(process)
+        while True:
+            if timeout is None and wait_idle is not None:
+                timeout = process.send(await wait_idle())
+                continue
+            deadline = None if timeout is None else time() + timeout
+            item = receive(0)
+            while item is None and (deadline is None or time() < deadline):
+                await wait_readable_async(fileno, None if deadline is None else deadline - time())
+                item = receive(0)
+            timeout = process.send(item)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_process_while_async(process: ProcessT[T], receive: Callable[[Optional[float]], Any], fileno: int,
+                                  is_running: Callable[[], bool], poll_time: float) -> Optional[T]:
+    try:
+        timeout = next(process)
+        while True:
+            item = receive(0)
+            if item is None:
+                await wait_readable_async(fileno, poll_time if timeout is None else timeout)
+                item = receive(0)
+            if item is None and timeout is None:
+                if not is_running():
+                    return None
+            else:
+                timeout = process.send(item)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def sleep_process_async(process: ProcessT[T]) -> T:
+    try:
+        timeout = next(process)
+        while True:
+            await asyncio.sleep(timeout)
+            timeout = process.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+
+def finish_process(connection: Connection, rtt_estimator: RttEstimator,
+                   max_retransmissions: Optional[int] = None) -> Generator[Optional[float], Optional[Ack], None]:
+    connection.send(Packet(-1, b''))
+    retransmissions = 0
+    ack = yield rtt_estimator.rto
+    while ack is None or ack.id != -1 or ack.is_cumulative:
+        if ack is None:
+            if max_retransmissions is not None and retransmissions >= max_retransmissions:
+                return
+            retransmissions += 1
+            rtt_estimator.back_off()
+            connection.send(Packet(-1, b''))
+            connection.metrics.fin_retransmissions += 1
+        ack = yield rtt_estimator.rto
+    rtt_estimator.reset_backoff()
@@ -0,0 +1,49 @@
+from typing import Optional
+
+
+class RttEstimator:
+    _srtt: Optional[float]
+    _rttvar: float
+    _rto: float
+    _backoff: int
+    _min_rto: float
+    _max_rto: float
+    _alpha: float = 1 / 8
+    _beta: float = 1 / 4
+
+    def __init__(self, initial_rto: float = 0.2, min_rto: float = 0.01, max_rto: float = 10):
+        self._srtt = None
+        self._rttvar = 0
+        self._rto = initial_rto
+        self._backoff = 0
+        self._min_rto = min_rto
+        self._max_rto = max_rto
+
+    @property
+    def srtt(self) -> Optional[float]:
+        return self._srtt
+
+    @property
+    def rttvar(self) -> float:
+        return self._rttvar
+
+    @property
+    def rto(self) -> float:
+        return min(self._rto * 2 ** self._backoff, self._max_rto)
+
+    def sample(self, rtt: float):
+        if self._srtt is None:
+            self._srtt = rtt
+            self._rttvar = rtt / 2
+        else:
+            self._rttvar = (1 - self._beta) * self._rttvar + self._beta * abs(self._srtt - rtt)
+            self._srtt = (1 - self._alpha) * self._srtt + self._alpha * rtt
+        self._rto = min(max(self._srtt + 4 * self._rttvar, self._min_rto), self._max_rto)
+        self._backoff = 0
+
+    def reset_backoff(self):
+        self._backoff = 0
+
+    def back_off(self):
+        if self._rto * 2 ** self._backoff < self._max_rto:
+            self._backoff += 1
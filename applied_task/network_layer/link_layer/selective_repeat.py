@@ -1,66 +1,228 @@
+from .congestion_window import CongestionWindow
 from .connection import Connection
-from .packet import Packet
-from random import random
+from .link_metrics import LinkMetrics
+from .packet import Ack, Packet, SACK_SIZE
+from .process import ClockT, finish_process, ProcessT, run_process
+from .rtt_estimator import RttEstimator
+from .send_stream import SendStream
+from .sender_result import SenderResult
+from random import random, Random
 from time import time
+from typing import Any, Callable, Dict, List, Optional, Set
 
 
-def sender(bytes_to_send: bytes, window_size: int, connection: Connection) -> int:
-    timeout = 0.2
-    strong_timeout = 10
-    packets_count_to_send = len(bytes_to_send)
+def _acknowledge(window: Dict[int, float], stream: SendStream, ack: Ack, retransmitted_packets_ids: Set[int],
+                 rtt_estimator: RttEstimator, current: float, metrics: LinkMetrics) -> int:
+    if ack.is_cumulative:
+        packets_ids = [packet_id for packet_id in window if packet_id <= ack.id]
+        packets_ids += [packet_id for packet_id in ack.sacked_ids() if packet_id in window]
+    else:
+        packets_ids = [ack.id] if ack.id in window else []
 
-    last_sent_packet_id = min(window_size, packets_count_to_send) - 1
-    connection.send_packets((Packet(i, bytes_to_send[i:i + 1]) for i in range(last_sent_packet_id + 1)))
-    sent_packets = last_sent_packet_id + 1
-    window = dict.fromkeys(range(0, last_sent_packet_id + 1), time())
+    samples = [current - window[packet_id] for packet_id in packets_ids if packet_id not in retransmitted_packets_ids]
+    for sample in samples:
+        metrics.ack_latency.observe(sample)
+    if len(samples) > 0:
+        rtt_estimator.sample(max(samples))
+    elif len(packets_ids) > 0:
+        rtt_estimator.reset_backoff()
 
-    start = time()
-    while not connection.not_empty_ack():
-        if time() - start > strong_timeout:
-            for packet_id, start in window.items():
-                connection.send(Packet(packet_id, bytes_to_send[packet_id:packet_id + 1]))
-                window[packet_id] = time()
-            start = time()
+    for packet_id in packets_ids:
+        window.pop(packet_id)
+        stream.release(packet_id)
+    return len(packets_ids)
+
+
+def stream_sender_process(stream: SendStream, window_size: int, connection: Connection,
+                          rtt_estimator: Optional[RttEstimator] = None,
+                          congestion_window: Optional[CongestionWindow] = None, clock: ClockT = time,
+                          max_fin_retransmissions: Optional[int] = None) -> ProcessT[SenderResult]:
+    if rtt_estimator is None:
+        rtt_estimator = RttEstimator()
+    metrics = connection.metrics
+    transfer_start = clock()
+    retransmitted_packets_ids: Set[int] = set()
+    receive_window = 0
+    recovery_packet_id = -1
+    last_sent_packet_id = -1
+    sent_packets = 0
+    retransmissions = 0
+    window: Dict[int, float] = {}
+
+    def current_window_size() -> int:
+        size = window_size if congestion_window is None else min(window_size, congestion_window.size)
+        return size if receive_window <= 0 else max(min(size, receive_window), 1)
+
+    def send_new_packets():
+        nonlocal last_sent_packet_id, sent_packets
+        while len(window) < current_window_size() and (last_sent_packet_id < stream.packets_count - 1 or
+                                                       stream.seal()):
+            last_sent_packet_id += 1
+            sent_packets += 1
+            connection.send(stream.packet(last_sent_packet_id))
+            window[last_sent_packet_id] = clock()
+
+    send_new_packets()
+
+    ack = None
+    if len(window) > 0:
+        ack = yield rtt_estimator.rto
+        while ack is None:
+            rtt_estimator.back_off()
+            if congestion_window is not None:
+                congestion_window.on_loss()
+            for packet_id in window:
+                connection.send(stream.packet(packet_id))
+                window[packet_id] = clock()
+            retransmitted_packets_ids.update(window)
             sent_packets += len(window)
+            retransmissions += len(window)
+            metrics.strong_timeout_retransmissions += len(window)
+            ack = yield rtt_estimator.rto
 
-    while len(window) > 0:
-        if connection.not_empty_ack():
-            packet_id = connection.receive_ack()
-            window.pop(packet_id, None)
+    while True:
+        if ack is not None:
+            metrics.window_occupancy.observe(len(window))
+            if ack.receive_window > 0:
+                receive_window = ack.receive_window
+            acked_packets = _acknowledge(window, stream, ack, retransmitted_packets_ids, rtt_estimator, clock(),
+                                         metrics)
+            if congestion_window is not None and acked_packets > 0:
+                congestion_window.on_ack(acked_packets)
+        sack = ack.sack if ack is not None and ack.is_cumulative else 0
 
+        current = clock()
+        rto = rtt_estimator.rto
+        srtt = rtt_estimator.srtt or 0
+        is_timeout = False
+        is_repeated_timeout = False
         for packet_id, start in window.items():
-            current = time()
-            if current - start > timeout:
-                connection.send(Packet(packet_id, bytes_to_send[packet_id:packet_id + 1]))
+            if sack > 0 and bin(sack >> (packet_id - ack.id)).count('1') >= 3 and current - start > srtt:
+                connection.send(stream.packet(packet_id))
+                window[packet_id] = current
+                retransmitted_packets_ids.add(packet_id)
+                sent_packets += 1
+                retransmissions += 1
+                metrics.fast_retransmissions += 1
+                is_timeout = True
+            elif current - start > rto:
+                connection.send(stream.packet(packet_id))
                 window[packet_id] = current
+                is_repeated_timeout = is_repeated_timeout or packet_id in retransmitted_packets_ids
+                retransmitted_packets_ids.add(packet_id)
                 sent_packets += 1
+                retransmissions += 1
+                metrics.timeout_retransmissions += 1
+                is_timeout = True
+        if is_repeated_timeout:
+            rtt_estimator.back_off()
+        if is_timeout and congestion_window is not None and min(window) > recovery_packet_id:
+            congestion_window.on_loss()
+            recovery_packet_id = last_sent_packet_id
 
-        while len(window) < window_size and last_sent_packet_id < packets_count_to_send - 1:
-            last_sent_packet_id += 1
-            sent_packets += 1
-            connection.send(Packet(last_sent_packet_id, bytes_to_send[last_sent_packet_id:last_sent_packet_id + 1]))
-            window[last_sent_packet_id] = time()
+        send_new_packets()
 
-    connection.send(Packet(-1, b''))
-    return sent_packets
+        if len(window) > 0:
+            ack = yield min(window.values()) + rtt_estimator.rto - clock()
+        elif stream.is_closed:
+            break
+        else:
+            ack = yield None
 
+    yield from finish_process(connection, rtt_estimator, max_fin_retransmissions)
+    metrics.transfer_time.observe(clock() - transfer_start)
+    return SenderResult(sent_packets, retransmissions, rtt_estimator.srtt)
 
-def receiver(transmission_error_probability: float, connection: Connection) -> bytes:
-    bytes_ = b''
+
+def sender_process(bytes_to_send: bytes, window_size: int, connection: Connection, segment_size: int = 1,
+                   rtt_estimator: Optional[RttEstimator] = None, congestion_window: Optional[CongestionWindow] = None,
+                   clock: ClockT = time) -> ProcessT[SenderResult]:
+    return (yield from stream_sender_process(SendStream.from_bytes(bytes_to_send, segment_size), window_size,
+                                             connection, rtt_estimator, congestion_window, clock))
+
+
+def sender(bytes_to_send: bytes, window_size: int, connection: Connection, segment_size: int = 1,
+           rtt_estimator: Optional[RttEstimator] = None,
+           congestion_window: Optional[CongestionWindow] = None) -> SenderResult:
+    return run_process(sender_process(bytes_to_send, window_size, connection, segment_size, rtt_estimator,
+                                      congestion_window), connection.receive_ack)
+
+
+def stream_receiver_process(transmission_error_probability: float, connection: Connection,
+                            deliver: Callable[[bytes], Any], segment_size: int = 1, ack_every: int = 1,
+                            ack_delay: float = 0.005, receive_window: int = 0, clock: ClockT = time,
+                            random_generator: Optional[Random] = None) -> ProcessT[int]:
+    random_ = random if random_generator is None else random_generator.random
+    metrics = connection.metrics
+    segments: Dict[int, bytes] = {}
+    total_size: Optional[int] = None
+    packets_count: Optional[int] = None
+    next_packet_id = 0
+    unacked_packets = 0
+    ack_deadline = None
+    advertised_window = receive_window
 
     while True:
-        if connection.not_empty_send():
-            packet: Packet = connection.receive_send()
+        packet: Optional[Packet] = yield None if ack_deadline is None else ack_deadline - clock()
+        if packet is not None:
             if packet.id == -1:
+                connection.ack(-1)
                 break
 
-            if random() > transmission_error_probability:
-                connection.ack(packet.id)
-                if len(bytes_) == packet.id:
-                    bytes_ += packet.data
-                elif len(bytes_) > packet.id:
-                    bytes_ = bytes_[:packet.id] + packet.data + bytes_[packet.id + 1:]
+            if random_() > transmission_error_probability:
+                if total_size is None:
+                    total_size = packet.total_size
+                    packets_count = (total_size + segment_size - 1) // segment_size if total_size > 0 else None
+
+                if (packet.id < 0 or packet.total_size != total_size or
+                        packets_count is not None and packet.id >= packets_count):
+                    metrics.stale_packets += 1
                 else:
-                    bytes_ = bytes_ + b''.join(b' ' for _ in range(packet.id - len(bytes_))) + packet.data
+                    is_in_order = packet.id == next_packet_id and len(segments) == 0
+                    if packet.id >= next_packet_id and packet.id not in segments:
+                        segments[packet.id] = packet.data
+                        while next_packet_id in segments:
+                            deliver(segments.pop(next_packet_id))
+                            next_packet_id += 1
+                    else:
+                        metrics.duplicate_packets += 1
+                    if receive_window > 0:
+                        advertised_window = max(receive_window - len(segments), 1)
+
+                    if ack_every == 1:
+                        connection.ack(packet.id, advertised_window)
+                    else:
+                        unacked_packets = unacked_packets + 1 if is_in_order else ack_every
+                        if ack_deadline is None:
+                            ack_deadline = clock() + ack_delay
+            else:
+                metrics.dropped_packets += 1
+
+        if unacked_packets > 0 and (packet is None or unacked_packets >= ack_every):
+            sack = 0
+            for packet_id in segments:
+                if packet_id - next_packet_id < SACK_SIZE:
+                    sack |= 1 << (packet_id - next_packet_id)
+            connection.ack_cumulative(next_packet_id - 1, sack, advertised_window)
+            unacked_packets = 0
+            ack_deadline = None
+
+    if packets_count is not None and next_packet_id != packets_count:
+        raise ValueError(f'received {next_packet_id + len(segments)} of {packets_count} packets')
+    return next_packet_id
+
+
+def receiver_process(transmission_error_probability: float, connection: Connection, segment_size: int = 1,
+                     ack_every: int = 1, ack_delay: float = 0.005, receive_window: int = 0,
+                     clock: ClockT = time, random_generator: Optional[Random] = None) -> ProcessT[bytes]:
+    segments: List[bytes] = []
+    yield from stream_receiver_process(transmission_error_probability, connection, segments.append, segment_size,
+                                       ack_every, ack_delay, receive_window, clock, random_generator)
+    return b''.join(segments)
+
 
-    return bytes_
+def receiver(transmission_error_probability: float, connection: Connection, segment_size: int = 1,
+             ack_every: int = 1, ack_delay: float = 0.005, receive_window: int = 0,
+             random_generator: Optional[Random] = None) -> bytes:
+    return run_process(receiver_process(transmission_error_probability, connection, segment_size, ack_every, ack_delay,
+                                        receive_window, time, random_generator), connection.receive_send)
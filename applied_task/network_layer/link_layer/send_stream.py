@@ -0,0 +1,67 @@
+from .packet import Packet
+from typing import Dict
+
+
+class SendStream:
+    _segment_size: int
+    _total_size: int
+    _buffer: bytearray
+    _offset: int
+    _packets: Dict[int, bytes]
+    _packets_count: int
+    _is_closed: bool
+
+    def __init__(self, segment_size: int, total_size: int = 0):
+        self._segment_size = segment_size
+        self._total_size = total_size
+        self._buffer = bytearray()
+        self._offset = 0
+        self._packets = {}
+        self._packets_count = 0
+        self._is_closed = False
+
+    @classmethod
+    def from_bytes(cls, bytes_: bytes, segment_size: int) -> 'SendStream':
+        stream = cls(segment_size, len(bytes_))
+        stream.write(bytes_)
+        stream.close()
+        return stream
+
+    @property
+    def packets_count(self) -> int:
+        return self._packets_count
+
+    @property
+    def has_pending(self) -> bool:
+        return self._offset < len(self._buffer)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.has_pending and len(self._packets) == 0
+
+    @property
+    def is_closed(self) -> bool:
+        return self._is_closed
+
+    def write(self, bytes_: bytes):
+        if self._offset > 0:
+            del self._buffer[:self._offset]
+            self._offset = 0
+        self._buffer += bytes_
+
+    def close(self):
+        self._is_closed = True
+
+    def seal(self) -> bool:
+        if not self.has_pending:
+            return False
+        self._packets[self._packets_count] = bytes(self._buffer[self._offset:self._offset + self._segment_size])
+        self._offset += len(self._packets[self._packets_count])
+        self._packets_count += 1
+        return True
+
+    def packet(self, packet_id: int) -> Packet:
+        return Packet(packet_id, self._packets[packet_id], self._total_size)
+
+    def release(self, packet_id: int):
+        self._packets.pop(packet_id, None)
@@ -0,0 +1,12 @@
+from typing import Optional
+
+
+class SenderResult:
+    sent_packets: int
+    retransmissions: int
+    rtt: Optional[float]
+
+    def __init__(self, sent_packets: int, retransmissions: int, rtt: Optional[float]):
+        self.sent_packets = sent_packets
+        self.retransmissions = retransmissions
+        self.rtt = rtt
@@ -0,0 +1,140 @@
+import os
+
+from .connection import Connection
+from .notifier import Notifier
+from .packet import Ack, Packet
+from multiprocessing import Semaphore
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+from typing import Any, Dict, Optional, Tuple
+
+
+class SharedMemoryRing:
+    _indices: Struct = Struct('<QQ')
+    _index: Struct = Struct('<Q')
+    _slot: Struct
+    _slot_size: int
+    _slots_count: int
+    _memory: SharedMemory
+    _items: Semaphore
+    _spaces: Semaphore
+    _notifier: Notifier
+    _owner_pid: int
+    _is_closed: bool
+
+    def __init__(self, slot_format: str, data_size: int, slots_count: int):
+        self._slot = Struct(f'<{slot_format}I')
+        self._slot_size = self._slot.size + data_size
+        self._slots_count = slots_count
+        self._memory = SharedMemory(create=True, size=self._indices.size + self._slot_size * self._slots_count)
+        self._indices.pack_into(self._memory.buf, 0, 0, 0)
+        self._items = Semaphore(0)
+        self._spaces = Semaphore(self._slots_count)
+        self._notifier = Notifier()
+        self._owner_pid = os.getpid()
+        self._is_closed = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_slot'] = self._slot.format
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._slot = Struct(state['_slot'])
+
+    @property
+    def data_size(self) -> int:
+        return self._slot_size - self._slot.size
+
+    def _offset(self, index: int) -> int:
+        return self._indices.size + (index % self._slots_count) * self._slot_size
+
+    def fileno(self) -> int:
+        return self._notifier.fileno()
+
+    def empty(self) -> bool:
+        head, tail = self._indices.unpack_from(self._memory.buf, 0)
+        return head == tail
+
+    def put(self, values: Tuple, data: bytes = b''):
+        if len(data) > self.data_size:
+            raise ValueError(f'data size must be at most {self.data_size}, not {len(data)}')
+        self._spaces.acquire()
+        buf = self._memory.buf
+        tail = self._index.unpack_from(buf, self._index.size)[0]
+        offset = self._offset(tail)
+        self._slot.pack_into(buf, offset, *values, len(data))
+        offset += self._slot.size
+        buf[offset:offset + len(data)] = data
+        self._index.pack_into(buf, self._index.size, tail + 1)
+        self._notifier.notify()
+        self._items.release()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[Tuple, bytes]]:
+        if not self._items.acquire(timeout=None if timeout is None else max(timeout, 0)):
+            return None
+        self._notifier.consume()
+        buf = self._memory.buf
+        head = self._index.unpack_from(buf, 0)[0]
+        offset = self._offset(head)
+        *values, size = self._slot.unpack_from(buf, offset)
+        offset += self._slot.size
+        data = bytes(buf[offset:offset + size])
+        self._index.pack_into(buf, 0, head + 1)
+        self._spaces.release()
+        return tuple(values), data
+
+    def close(self):
+        if self._is_closed:
+            return
+        self._is_closed = True
+        self._memory.close()
+        if os.getpid() == self._owner_pid:
+            self._memory.unlink()
+        self._notifier.close()
+
+
+class SharedMemoryConnection(Connection):
+    _ring_to_send: SharedMemoryRing
+    _ring_to_ack: SharedMemoryRing
+
+    def __init__(self, segment_size: int, slots_count: int = 1024, ack_slots_count: int = 8192):
+        super().__init__()
+        self._ring_to_send = SharedMemoryRing('qQQ', segment_size, slots_count)
+        self._ring_to_ack = SharedMemoryRing('qQ?iQ', 0, ack_slots_count)
+
+    def _has_packets(self) -> bool:
+        return not self._ring_to_send.empty()
+
+    def _put_packet(self, packet: Packet):
+        self._ring_to_send.put((packet.id, packet.total_size, packet.transfer_id), packet.data)
+
+    def _put_ack(self, ack: Ack):
+        self._ring_to_ack.put((ack.id, ack.sack, ack.is_cumulative, ack.receive_window, ack.transfer_id))
+
+    def _receive_packet(self, timeout: Optional[float]) -> Optional[Packet]:
+        item = self._ring_to_send.get(timeout)
+        if item is None:
+            return None
+        (packet_id, total_size, transfer_id), data = item
+        return Packet(packet_id, data, total_size, transfer_id)
+
+    def _receive_ack(self, timeout: Optional[float]) -> Optional[Ack]:
+        item = self._ring_to_ack.get(timeout)
+        if item is None:
+            return None
+        return Ack(*item[0])
+
+    def not_empty_ack(self) -> bool:
+        return not self._ring_to_ack.empty()
+
+    def send_fileno(self) -> int:
+        return self._ring_to_send.fileno()
+
+    def ack_fileno(self) -> int:
+        return self._ring_to_ack.fileno()
+
+    def close(self):
+        self._ring_to_send.close()
+        self._ring_to_ack.close()
@@ -0,0 +1,109 @@
+from .channel import Channel
+from .congestion_window import CongestionWindow
+from .connection import Connection
+from .link import ProtocolT, RECEIVER_PROCESS, SENDER_PROCESS
+from .packet import Ack, Packet
+from .process import ProcessT
+from .sender_result import SenderResult
+from heapq import heappop, heappush
+from random import Random
+from typing import Any, List, Optional, Tuple
+
+
+class Simulator:
+    _time: float
+    _events: List[Tuple[float, int, bool, Any]]
+    _events_count: int
+    _free_times: List[float]
+    _delay: float
+    _transmission_time: float
+    _timer_resolution: float
+
+    def __init__(self, delay: float = 0.001, transmission_time: float = 0.0001, timer_resolution: float = 0.000001):
+        self._time = 0
+        self._events = []
+        self._events_count = 0
+        self._free_times = [0, 0]
+        self._delay = delay
+        self._transmission_time = transmission_time
+        self._timer_resolution = timer_resolution
+
+    def clock(self) -> float:
+        return self._time
+
+    def transmit(self, item: Any, is_ack: bool, delay: float = 0):
+        start = max(self._time, self._free_times[is_ack])
+        self._free_times[is_ack] = start + (0 if is_ack else self._transmission_time)
+        heappush(self._events, (self._free_times[is_ack] + self._delay + delay, self._events_count, is_ack, item))
+        self._events_count += 1
+
+    def run(self, sender: ProcessT[SenderResult], receiver: ProcessT[bytes],
+            connection: Connection) -> Tuple[SenderResult, bytes]:
+        processes = [receiver, sender]
+        deadlines = [float('inf'), float('inf')]
+        results: List[Any] = [None, None]
+        is_finished = [False, False]
+
+        def resume(index: int, value: Any):
+            try:
+                timeout = processes[index].send(value)
+                deadlines[index] = (float('inf') if timeout is None
+                                    else self._time + max(timeout, 0) + self._timer_resolution)
+            except StopIteration as stop:
+                results[index] = stop.value
+                deadlines[index] = float('inf')
+                is_finished[index] = True
+
+        resume(0, None)
+        resume(1, None)
+        while not all(is_finished):
+            index = 0 if deadlines[0] <= deadlines[1] else 1
+            if len(self._events) > 0 and self._events[0][0] <= deadlines[index]:
+                (self._time, _, is_ack, item) = heappop(self._events)
+                is_accepted = connection.accept_ack(item) if is_ack else connection.accept_packet(item)
+                if is_accepted and not is_finished[is_ack]:
+                    resume(is_ack, item)
+            elif deadlines[index] < float('inf'):
+                self._time = deadlines[index]
+                resume(index, None)
+            else:
+                raise RuntimeError('simulation is deadlocked: no events and no timeouts are pending')
+
+        return results[1], results[0]
+
+
+class SimulatedConnection(Connection):
+    _simulator: Simulator
+    _data_channel: Channel
+    _ack_channel: Channel
+
+    def __init__(self, simulator: Simulator, data_channel: Optional[Channel] = None,
+                 ack_channel: Optional[Channel] = None):
+        super().__init__()
+        self._simulator = simulator
+        self._data_channel = data_channel if data_channel is not None else Channel()
+        self._ack_channel = ack_channel if ack_channel is not None else Channel()
+
+    def _put_packet(self, packet: Packet):
+        for delay in self._data_channel.transmit():
+            self._simulator.transmit(packet, False, delay)
+
+    def _put_ack(self, ack: Ack):
+        for delay in self._ack_channel.transmit():
+            self._simulator.transmit(ack, True, delay)
+
+
+def simulate(bytes_to_send: bytes, window_size: int, transmission_error_probability: float, protocol: ProtocolT,
+             segment_size: int = 1, ack_every: int = 1, ack_delay: float = 0.005,
+             congestion_window: Optional[CongestionWindow] = None, receive_window: int = 0,
+             seed: Optional[int] = None, delay: float = 0.001, transmission_time: float = 0.0001,
+             data_channel: Optional[Channel] = None,
+             ack_channel: Optional[Channel] = None) -> Tuple[SenderResult, bytes, float]:
+    simulator = Simulator(delay, transmission_time)
+    connection = SimulatedConnection(simulator, data_channel, ack_channel)
+    sender = SENDER_PROCESS[protocol](bytes_to_send, window_size, connection, segment_size, None, congestion_window,
+                                      simulator.clock)
+    receiver = RECEIVER_PROCESS[protocol](transmission_error_probability, connection, segment_size, ack_every,
+                                          ack_delay, receive_window, simulator.clock, Random(seed))
+    result, received_bytes = simulator.run(sender, receiver, connection)
+    return result, received_bytes, simulator.clock()
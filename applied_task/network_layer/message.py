@@ -1,5 +1,6 @@
+from .topology import Topology
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class MessageType(Enum):
@@ -9,6 +10,9 @@ class MessageType(Enum):
     SET_TOPOLOGY = 'SET_TOPOLOGY'
     DATA = 'DATA'
     DISCONNECT = 'DISCONNECT'
+    UPDATE_TOPOLOGY = 'UPDATE_TOPOLOGY'
+    GET_TOPOLOGY = 'GET_TOPOLOGY'
+    SET_NEXT_HOPS = 'SET_NEXT_HOPS'
 
 
 class Message:
@@ -31,3 +35,38 @@ class MessageHelloDataT:
     def __init__(self, id_: int, start_time: float):
         self.id = id_
         self.start_time = start_time
+
+
+class MessageTopologyDataT:
+    sequence_number: int
+    topology: Topology
+
+    def __init__(self, sequence_number: int, topology: Topology):
+        self.sequence_number = sequence_number
+        self.topology = topology
+
+
+class MessageTopologyUpdateDataT:
+    sequence_number: int
+    removed_nodes: List[int]
+    removed_edges: List[Tuple[int, int]]
+    added_edges: List[Tuple[int, int, float]]
+
+    def __init__(self, sequence_number: int, removed_nodes: List[int], removed_edges: List[Tuple[int, int]],
+                 added_edges: List[Tuple[int, int, float]]):
+        self.sequence_number = sequence_number
+        self.removed_nodes = removed_nodes
+        self.removed_edges = removed_edges
+        self.added_edges = added_edges
+
+    def __len__(self) -> int:
+        return len(self.removed_nodes) + len(self.removed_edges) + len(self.added_edges)
+
+
+class MessageNextHopsDataT:
+    sequence_number: int
+    next_hops: Dict[int, List[int]]
+
+    def __init__(self, sequence_number: int, next_hops: Dict[int, List[int]]):
+        self.sequence_number = sequence_number
+        self.next_hops = next_hops
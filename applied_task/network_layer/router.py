@@ -1,7 +1,10 @@
 import os
 
+from .forwarding_table import ForwardingTable, get_forwarding_table
 from .link import LinkInput, LinkOutput
-from .message import Message, MessageHelloDataT, MessageType
+from .link_layer import ProcessT, run_process, sleep_process_async
+from .message import (Message, MessageHelloDataT, MessageNextHopsDataT, MessageTopologyDataT,
+                      MessageTopologyUpdateDataT, MessageType)
 from .topology import Topology
 from logging import FileHandler, getLogger, INFO, Logger
 from multiprocessing import Event
@@ -19,8 +22,11 @@ class Router:
     _neighbors: Dict[int, int]
     _active_neighbors: Set[int]
     _topology: Optional[Topology]
+    _topology_sequence_number: int
+    _is_topology_requested: bool
+    _next_hops: Optional[MessageNextHopsDataT]
     _topology_name: str
-    _ways: Optional[Dict[int, List[int]]]
+    _forwarding_table: Optional[ForwardingTable]
     _logger: Logger
     _sleep_time: float = 0.1
 
@@ -34,8 +40,11 @@ class Router:
         self._neighbors = {}
         self._active_neighbors = set()
         self._topology = None
+        self._topology_sequence_number = -1
+        self._is_topology_requested = False
+        self._next_hops = None
         self._topology_name = topology_name
-        self._ways = None
+        self._forwarding_table = None
         self._logger = getLogger(f'R_{self._id}')
         self._logger.setLevel(INFO)
         if logfile_path is None:
@@ -46,7 +55,7 @@ class Router:
         fh.setLevel(INFO)
         self._logger.addHandler(fh)
 
-    def _receive_hello(self, stop_event: Event) -> Dict[int, Tuple[int, float]]:
+    def _receive_hello(self, stop_event: Event) -> ProcessT[Dict[int, Tuple[int, float]]]:
         input_neighbors: Dict[int, Tuple[int, float]] = {}
 
         while not stop_event.is_set() and len(input_neighbors) != len(self._links_inputs):
@@ -62,18 +71,52 @@ class Router:
 
                     is_need_sleep = False
 
-            if is_need_sleep:
-                sleep(self._sleep_time)
+            yield self._sleep_time if is_need_sleep else 0
 
         return input_neighbors
 
-    def _set_topology(self, topology: Topology):
-        self._topology = topology
-        self._ways = self._topology.get_shortest_ways(self._id)
+    def _update_forwarding_table(self):
+        if self._next_hops is not None and self._next_hops.sequence_number == self._topology_sequence_number:
+            next_hops = self._next_hops.next_hops
+        else:
+            next_hops = self._topology.get_next_hops(self._id)
+        self._forwarding_table = get_forwarding_table(next_hops, self._neighbors)
         self._active_neighbors = set(self._topology.get_neighbors(self._id))
-        self._logger.info(f'new shortest ways: {self._ways}')
-
-    def _init_topology(self, stop_event: Event, input_neighbors: Dict[int, Tuple[int, float]]):
+        self._logger.info(f'new forwarding table: {self._forwarding_table.to_dict()}')
+
+    def _set_topology(self, data: MessageTopologyDataT):
+        if self._topology is None:
+            self._topology = data.topology
+        else:
+            self._topology.update(data.topology)
+        self._topology_sequence_number = data.sequence_number
+        self._is_topology_requested = False
+        self._update_forwarding_table()
+
+    def _set_next_hops(self, data: MessageNextHopsDataT):
+        self._next_hops = data
+        if self._topology is not None and data.sequence_number == self._topology_sequence_number:
+            self._update_forwarding_table()
+
+    def _update_topology(self, update: MessageTopologyUpdateDataT):
+        if update.sequence_number <= self._topology_sequence_number or self._is_topology_requested:
+            return
+        if self._topology is None or update.sequence_number != self._topology_sequence_number + 1:
+            self._logger.info(f'missed topology updates before {update.sequence_number}, requesting topology')
+            self._is_topology_requested = True
+            self._dr_link_output.send(Message(self._id, None, MessageType.GET_TOPOLOGY, None))
+            return
+
+        for node in update.removed_nodes:
+            self._topology.remove_node(node)
+        for src, dst in update.removed_edges:
+            self._topology.remove_edge(src, dst)
+        for src, dst, weight in update.added_edges:
+            self._topology.add_edge(src, dst, weight)
+        self._topology_sequence_number = update.sequence_number
+        self._update_forwarding_table()
+
+    def _init_topology(self, stop_event: Event, input_neighbors: Dict[int, Tuple[int, float]]) -> ProcessT[None]:
         is_need_set_neighbors = False
         is_topology_set = False
         is_neighbors_set = False
@@ -88,6 +131,8 @@ class Router:
                     self._logger.info('received topology')
                     self._set_topology(message.data)
                     is_topology_set = True
+                elif message.type == MessageType.SET_NEXT_HOPS:
+                    self._set_next_hops(message.data)
                 elif message.type == MessageType.SET_NEIGHBORS:
                     self._neighbors = message.data
                     is_neighbors_set = True
@@ -98,15 +143,17 @@ class Router:
                 is_need_set_neighbors = False
                 self._dr_link_output.send(Message(self._id, None, MessageType.SET_NEIGHBORS, input_neighbors))
 
-            if is_need_sleep:
-                sleep(self._sleep_time)
+            yield self._sleep_time if is_need_sleep else 0
 
-    def _hello_stage(self, stop_event: Event):
+    def _hello_process(self, stop_event: Event) -> ProcessT[None]:
         for i, link in enumerate(self._links_outputs):
             link.send(Message(self._id, None, MessageType.HELLO, MessageHelloDataT(i, time())))
 
-        input_neighbors = self._receive_hello(stop_event)
-        self._init_topology(stop_event, input_neighbors)
+        input_neighbors = yield from self._receive_hello(stop_event)
+        yield from self._init_topology(stop_event, input_neighbors)
+
+    def _hello_stage(self, stop_event: Event):
+        run_process(self._hello_process(stop_event), sleep)
 
     def _start_links(self):
         for link in self._links_inputs:
@@ -123,25 +170,29 @@ class Router:
             link.stop_receiving()
         self._dr_link_output.stop_sending()
         self._dr_link_input.stop_receiving()
+        for i, link in enumerate(self._links_outputs):
+            self._logger.info(f'output link {i} metrics: {link.metrics.to_dict()}')
+        for i, link in enumerate(self._links_inputs):
+            self._logger.info(f'input link {i} metrics: {link.metrics.to_dict()}')
 
-    def run(self, stop_event: Event, send_event: Event, *args):
+    def _run_process(self, stop_event: Event, send_event: Event) -> ProcessT[None]:
         self._start_links()
-        self._hello_stage(stop_event)
+        yield from self._hello_process(stop_event)
 
         active = True
-        is_need_sleep = True
 
         while not stop_event.is_set():
+            is_need_sleep = True
             for link_in in self._links_inputs:
                 if link_in.not_empty():
                     message = link_in.receive()
                     if message.type == MessageType.DATA and active:
+                        link = self._forwarding_table.get_link(message.dst, hash((message.src, message.dst)))
                         if message.dst == self._id:
                             self._logger.info(f'received message from {message.src}: {message.data}')
-                        elif message.dst in self._ways:
-                            neighbor = self._ways[message.dst][1]
+                        elif link >= 0:
                             message.data += [self._id]
-                            self._links_outputs[self._neighbors[neighbor]].send(message)
+                            self._links_outputs[link].send(message)
                             self._logger.info(f'transferred message from {message.src} to {message.dst}: '
                                               f'{message.data}')
                         else:
@@ -150,12 +201,13 @@ class Router:
 
             if send_event.is_set():
                 if active:
-                    node = choice(list(self._ways))
-                    if len(self._ways[node]) == 0:
+                    node = choice(self._forwarding_table.destinations)
+                    link = self._forwarding_table.get_link(node, hash((self._id, node)))
+                    if link < 0:
                         self._logger.info(f'cannot send message to {node}')
                     else:
                         message = Message(self._id, node, MessageType.DATA, [self._id])
-                        self._links_outputs[self._neighbors[self._ways[node][1]]].send(message)
+                        self._links_outputs[link].send(message)
                         self._logger.info(f'sent message to {message.dst}: {message.data}')
                 send_event.clear()
 
@@ -164,11 +216,23 @@ class Router:
                 if message.type == MessageType.SET_TOPOLOGY:
                     self._logger.info('received topology')
                     self._set_topology(message.data)
+                elif message.type == MessageType.UPDATE_TOPOLOGY:
+                    self._logger.info('received topology update')
+                    self._update_topology(message.data)
+                elif message.type == MessageType.SET_NEXT_HOPS:
+                    self._set_next_hops(message.data)
                 elif message.type == MessageType.DISCONNECT:
                     active = False
                 is_need_sleep = False
 
-            if is_need_sleep:
-                sleep(self._sleep_time)
+            yield self._sleep_time if is_need_sleep else 0
 
         self._stop_links()
+
+    def run(self, stop_event: Event, send_event: Event, *args):
+        run_process(self._run_process(stop_event, send_event), sleep)
+
+    async def run_async(self, stop_event: Event, send_event: Event, *args):
+        await sleep_process_async(self._run_process(stop_event, send_event))
+        for link in self._links_outputs + self._links_inputs + [self._dr_link_output, self._dr_link_input]:
+            await link.join()
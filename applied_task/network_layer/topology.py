@@ -1,30 +1,98 @@
-from copy import deepcopy
-from queue import PriorityQueue
+from .csr_graph import CsrGraph
+from heapq import heappop, heappush
 from networkx import DiGraph
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 
 
 class Topology:
     _graph: DiGraph
+    _distances: Dict[int, Dict[int, float]]
+    _predecessors: Dict[int, Dict[int, Set[int]]]
+    _csr_graph: Optional[CsrGraph]
+    _cost_tolerance: float = 1e-9
 
     def __init__(self):
         self._graph = DiGraph()
+        self._distances = {}
+        self._predecessors = {}
+        self._csr_graph = None
 
     @property
     def graph(self) -> DiGraph:
-        return deepcopy(self._graph)
+        return self._graph.copy()
 
     def add_node(self, node_to_add: int):
+        if node_to_add not in self._graph:
+            self._csr_graph = None
         self._graph.add_node(node_to_add)
+        for root, distances in self._distances.items():
+            distances.setdefault(node_to_add, float('inf'))
+            self._predecessors[root].setdefault(node_to_add, set())
 
     def remove_node(self, node_to_del: int):
+        self._distances.pop(node_to_del, None)
+        self._predecessors.pop(node_to_del, None)
+        subtrees = {root: self._get_subtree(root, node_to_del) for root in self._distances}
         self._graph.remove_node(node_to_del)
+        self._csr_graph = None
+        for root, subtree in subtrees.items():
+            subtree.discard(node_to_del)
+            self._distances[root].pop(node_to_del)
+            self._predecessors[root].pop(node_to_del)
+            self._update_shortest_ways(root, subtree)
 
     def add_edge(self, src: int, dst: int, weight: float):
+        if self._graph.has_edge(src, dst):
+            self.remove_edge(src, dst)
+        self.add_node(src)
+        self.add_node(dst)
         self._graph.add_edge(src, dst, weight=weight)
+        self._csr_graph = None
+        for root, distances in self._distances.items():
+            if distances[src] == float('inf'):
+                continue
+            new_cost = distances[src] + weight
+            difference = new_cost - distances[dst]
+            if difference < -self._cost_tolerance * new_cost:
+                distances[dst] = new_cost
+                self._predecessors[root][dst] = {src}
+                self._relax(root, [(new_cost, dst)])
+            elif difference <= self._cost_tolerance * new_cost:
+                self._predecessors[root][dst].add(src)
 
     def remove_edge(self, src: int, dst: int):
+        subtrees = {}
+        for root, predecessors in self._predecessors.items():
+            if src in predecessors[dst]:
+                if len(predecessors[dst]) > 1:
+                    predecessors[dst].remove(src)
+                else:
+                    subtrees[root] = self._get_subtree(root, dst)
         self._graph.remove_edge(src, dst)
+        self._csr_graph = None
+        for root, subtree in subtrees.items():
+            self._update_shortest_ways(root, subtree)
+
+    def update(self, topology: 'Topology'):
+        nodes = set(topology.get_nodes())
+        for node in [node for node in self._graph if node not in nodes]:
+            self.remove_node(node)
+        for src, dst in [(src, dst) for src, dst in self._graph.edges if not topology.has_edge(src, dst)]:
+            self.remove_edge(src, dst)
+        for node in nodes:
+            self.add_node(node)
+        for src, dst, weight in topology.get_edges():
+            if not self.has_edge(src, dst) or self.get_weight(src, dst) != weight:
+                self.add_edge(src, dst, weight)
+
+    def get_nodes(self) -> List[int]:
+        return list(self._graph.nodes)
+
+    def get_edges(self) -> List[Tuple[int, int, float]]:
+        return [(src, dst, weight) for src, dst, weight in self._graph.edges.data('weight')]
+
+    def get_edges_count(self) -> int:
+        return self._graph.number_of_edges()
 
     def get_neighbors(self, node: int) -> List[int]:
         return list(self._graph.neighbors(node))
@@ -35,31 +103,131 @@ class Topology:
     def get_weight(self, src: int, dst: int) -> float:
         return self._graph[src][dst]['weight']
 
-    def get_shortest_ways(self, root_node: int) -> Dict[int, List[int]]:
-        ways = {node: [] for node in self._graph}
-        ways[root_node] = [root_node]
-
-        distances = {node: float('inf') for node in self._graph}
-        distances[root_node] = 0
-
-        queue = PriorityQueue()
-        queue.put((0, root_node))
-
-        unvisited = set(self._graph)
-
-        while not queue.empty():
-            (distance, node) = queue.get()
-            if node not in unvisited:
+    def _get_subtree(self, root: int, subtree_root: int) -> Set[int]:
+        predecessors = self._predecessors[root]
+        if subtree_root == root or len(predecessors.get(subtree_root, ())) == 0:
+            return set()
+        subtree = {subtree_root}
+        nodes = [subtree_root]
+        while len(nodes) > 0:
+            node = nodes.pop()
+            for neighbor in self._graph.successors(node):
+                if node in predecessors[neighbor] and neighbor not in subtree:
+                    subtree.add(neighbor)
+                    nodes.append(neighbor)
+        return subtree
+
+    def _relax(self, root: int, queue: List[Tuple[float, int]]):
+        distances = self._distances[root]
+        predecessors = self._predecessors[root]
+
+        while len(queue) > 0:
+            (distance, node) = heappop(queue)
+            if distance > distances[node]:
                 continue
-            unvisited.remove(node)
 
             for neighbor, attrs in self._graph[node].items():
-                if neighbor in unvisited:
-                    new_cost = distance + attrs['weight']
-                    if new_cost < distances[neighbor]:
-                        queue.put((new_cost, neighbor))
-                        distances[neighbor] = new_cost
-                        ways[neighbor] = ways[node] + [neighbor]
-
-        ways.pop(root_node)
-        return ways
+                new_cost = distance + attrs['weight']
+                difference = new_cost - distances[neighbor]
+                if difference < -self._cost_tolerance * new_cost:
+                    heappush(queue, (new_cost, neighbor))
+                    distances[neighbor] = new_cost
+                    predecessors[neighbor] = {node}
+                elif difference <= self._cost_tolerance * new_cost:
+                    predecessors[neighbor].add(node)
+
+    def _update_shortest_ways(self, root: int, nodes: Set[int]):
+        distances = self._distances[root]
+        predecessors = self._predecessors[root]
+        for node in nodes:
+            distances[node] = float('inf')
+            predecessors[node] = set()
+
+        queue = []
+        for node in nodes:
+            for src, _, weight in self._graph.in_edges(node, data='weight'):
+                if src in nodes or distances[src] == float('inf'):
+                    continue
+                new_cost = distances[src] + weight
+                difference = new_cost - distances[node]
+                if difference < -self._cost_tolerance * new_cost:
+                    distances[node] = new_cost
+                    predecessors[node] = {src}
+                elif difference <= self._cost_tolerance * new_cost:
+                    predecessors[node].add(src)
+            if len(predecessors[node]) > 0:
+                heappush(queue, (distances[node], node))
+        self._relax(root, queue)
+
+    def _get_csr_graph(self) -> CsrGraph:
+        if self._csr_graph is None:
+            self._csr_graph = CsrGraph(self._graph)
+        return self._csr_graph
+
+    def _init_shortest_ways(self, root_node: int):
+        nodes = self._get_csr_graph().nodes
+        distances, predecessors = self._get_csr_graph().get_shortest_ways(root_node, self._cost_tolerance)
+        self._distances[root_node] = dict(zip(nodes, distances))
+        self._predecessors[root_node] = {node: {nodes[predecessor] for predecessor in node_predecessors}
+                                         for node, node_predecessors in zip(nodes, predecessors)}
+
+    def _get_predecessors(self, root_node: int) -> Dict[int, Set[int]]:
+        if root_node not in self._predecessors:
+            self._init_shortest_ways(root_node)
+        return self._predecessors[root_node]
+
+    def get_shortest_ways(self, root_node: int) -> Dict[int, List[int]]:
+        return {node: sorted(predecessors) for node, predecessors in self._get_predecessors(root_node).items()
+                if node != root_node}
+
+    def get_shortest_way(self, root_node: int, node: int) -> List[int]:
+        predecessors = self._get_predecessors(root_node)
+        way = [node]
+        while way[-1] != root_node:
+            if len(predecessors[way[-1]]) == 0:
+                return []
+            way.append(min(predecessors[way[-1]]))
+        return way[::-1]
+
+    def get_next_hops(self, root_node: int) -> Dict[int, List[int]]:
+        predecessors = self._get_predecessors(root_node)
+        next_hops: Dict[int, Set[int]] = {root_node: set()}
+        for node in self._graph:
+            unresolved = [node]
+            while len(unresolved) > 0:
+                node = unresolved[-1]
+                if node in next_hops:
+                    unresolved.pop()
+                    continue
+                missing = [predecessor for predecessor in predecessors[node] if predecessor not in next_hops]
+                if len(missing) > 0:
+                    unresolved += missing
+                    continue
+                unresolved.pop()
+                next_hops[node] = set()
+                for predecessor in predecessors[node]:
+                    next_hops[node] |= {node} if predecessor == root_node else next_hops[predecessor]
+
+        next_hops.pop(root_node)
+        return {node: sorted(hops) for node, hops in next_hops.items()}
+
+    def all_pairs_next_hops(self) -> Dict[int, Dict[int, List[int]]]:
+        csr_graph = self._get_csr_graph()
+        nodes = csr_graph.nodes
+        next_hops: Dict[int, Dict[int, List[int]]] = {}
+        for root_node in nodes:
+            distances, predecessors = csr_graph.get_shortest_ways(root_node, self._cost_tolerance)
+            root = csr_graph.indices[root_node]
+            neighbors = sorted(set(csr_graph.targets[csr_graph.offsets[root]:csr_graph.offsets[root + 1]]),
+                               key=nodes.__getitem__)
+            bits = {neighbor: 1 << i for i, neighbor in enumerate(neighbors)}
+            masks = [0] * len(nodes)
+            for node in sorted(range(len(nodes)), key=distances.__getitem__):
+                mask = 0
+                for predecessor in predecessors[node]:
+                    mask |= bits[node] if predecessor == root else masks[predecessor]
+                masks[node] = mask
+            hops = {mask: [nodes[neighbor] for i, neighbor in enumerate(neighbors) if mask >> i & 1]
+                    for mask in set(masks)}
+            next_hops[root_node] = {nodes[node]: hops[mask].copy() for node, mask in enumerate(masks) if node != root}
+        return next_hops
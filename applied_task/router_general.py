@@ -5,7 +5,7 @@ from .network_layer import LinkInput, LinkOutput, Message, MessageType, Router
 from multiprocessing import Event
 from random import randint
 from time import sleep
-from typing import List
+from typing import Any, List
 
 
 class RouterGeneral(Router):
@@ -23,6 +23,9 @@ class RouterGeneral(Router):
     def value(self) -> bool:
         return self._value
 
+    def _create_data(self, m: int, value: bool, lieutenant_id: int) -> Any:
+        return MessageData(m - 1, value, [self._id, lieutenant_id])
+
     def run(self, stop_event: Event, m: int, *args):
         self._start_links()
         self._hello_stage(stop_event)
@@ -33,8 +36,7 @@ class RouterGeneral(Router):
         for lieutenant_id, lieutenant_link_id in self._neighbors.items():
             lieutenant_link = self._links_outputs[lieutenant_link_id]
             value = bool(randint(0, 1)) if self._is_traitor else self._value
-            data = MessageData(m - 1, value, [self._id, lieutenant_id])
-            message = Message(self._id, lieutenant_id, MessageType.DATA, data)
+            message = Message(self._id, lieutenant_id, MessageType.DATA, self._create_data(m, value, lieutenant_id))
             lieutenant_link.send(message)
             self._logger.info(f'sent {value} to lieutenant {lieutenant_id}')
 
@@ -2,17 +2,19 @@ import os
 
 from .message_data import MessageData
 from .network_layer import LinkInput, LinkOutput, Message, MessageType, Router
-from .tree import TreeNode
-from collections import Counter
+from .tree import MajorityTracker, Tree
+from logging import DEBUG
 from multiprocessing import Event
 from random import randint
-from time import sleep
-from typing import List, Tuple
+from time import sleep, time
+from typing import Dict, List, Tuple
 
 
 class RouterLieutenant(Router):
     _is_traitor: bool
     _value: bool
+    _straggler_timeout: float = 10
+    _batch_timeout: float = 0.05
 
     def __init__(self, id_: int, dr_link_input: LinkInput, dr_link_output: LinkOutput, general_link_input: LinkInput,
                  lieutenants_links_inputs: List[LinkInput], lieutenants_links_outputs: List[LinkOutput],
@@ -27,82 +29,106 @@ class RouterLieutenant(Router):
     def value(self) -> bool:
         return self._value
 
-    def _send_value(self, m: int, received_value: bool, received_path: List[int]):
+    def _add_value(self, batches: Dict[int, List[MessageData]], m: int, received_value: bool,
+                   received_path: List[int]):
         for lieutenant in filter(lambda l: l not in received_path, self._neighbors):
             value = bool(randint(0, 1)) if self._is_traitor else received_value
-            data_out = MessageData(m, value, received_path + [lieutenant])
-            message_out = Message(self._id, lieutenant, MessageType.DATA, data_out)
+            batches.setdefault(lieutenant, []).append(MessageData(m, value, received_path + [lieutenant]))
+
+    def _send_batches(self, batches: Dict[int, List[MessageData]]):
+        for lieutenant, batch in batches.items():
+            message_out = Message(self._id, lieutenant, MessageType.DATA, batch)
             self._links_outputs[self._neighbors[lieutenant]].send(message_out)
-            self._logger.info(f'sent message to {lieutenant}: {value}, {data_out.path}')
+            self._logger.info(f'sent {len(batch)} messages to {lieutenant}: '
+                              f'{[(data.value, data.path) for data in batch]}')
 
-    def _receive_general_value(self) -> Tuple[int, bool]:
+    def _receive_general_message(self) -> Message:
         while True:
             general_message = self._links_inputs[0].receive()
             if general_message.type == MessageType.DATA:
-                general_id = general_message.src
-                general_data: MessageData = general_message.data
-                general_value = general_data.value
-                self._logger.info(f'received value from general: {general_value}')
-                break
-        return general_id, general_value
+                return general_message
+
+    def _receive_general_value(self) -> Tuple[int, bool]:
+        general_message = self._receive_general_message()
+        general_data: MessageData = general_message.data
+        self._logger.info(f'received value from general: {general_data.value}')
+        return general_message.src, general_data.value
 
-    def _create_tree(self, stop_event: Event, m: int, general_id: int, general_value: bool) -> TreeNode:
-        tree = TreeNode(general_id, general_value, {self._id: TreeNode(self._id, general_value)})
+    def _create_tree(self, stop_event: Event, m: int, general_id: int, general_value: bool) -> MajorityTracker:
+        tracker = MajorityTracker(Tree(general_id, general_value, list(self._neighbors) + [self._id], m + 1, self._id))
+        tracker.add([self._id], general_value)
 
         neighbors_lieutenants_count = len(self._neighbors)
         neighbors_lieutenants_count_ = neighbors_lieutenants_count
+        relays_count = neighbors_lieutenants_count - 1
         messages_count = 0
+        rounds_relays_counts: Dict[int, int] = {}
         for i in range(1, min(m, neighbors_lieutenants_count) + 1):
             messages_count += neighbors_lieutenants_count_
+            rounds_relays_counts[m - 1 - i] = relays_count
             neighbors_lieutenants_count_ *= neighbors_lieutenants_count - i
+            relays_count *= neighbors_lieutenants_count - 1 - i
 
-        self._send_value(m - 2, general_value, [general_id, self._id])
+        batches: Dict[int, List[MessageData]] = {}
+        self._add_value(batches, m - 2, general_value, [general_id, self._id])
+        self._send_batches(batches)
 
+        rounds_batches: Dict[int, Dict[int, List[MessageData]]] = {}
+        batches_times: Dict[Tuple[int, int], float] = {}
+        relays_counts: Dict[Tuple[int, int], int] = {}
         received_messages = 0
-        while not stop_event.is_set() and received_messages < messages_count:
+        receive_time = time()
+        while (not stop_event.is_set() and received_messages < messages_count and
+               time() - receive_time < self._straggler_timeout):
             for lieutenant_link_input in self._links_inputs[1:]:
                 if lieutenant_link_input.not_empty():
                     message = lieutenant_link_input.receive()
                     if message.type == MessageType.DATA:
-                        received_messages += 1
-                        data: MessageData = message.data
-                        self._logger.info(f'received message ({received_messages}) from {message.src}: {data.value}, '
-                                          f'{data.path}')
-                        subtree = tree
-                        for lieutenant in data.path[1:]:
-                            subtree[lieutenant] = subtree.get(lieutenant, TreeNode(lieutenant, data.value))
-                            subtree = subtree[lieutenant]
-
-                        if data.m >= 0:
-                            self._send_value(data.m - 1, data.value, data.path)
-
-        self._logger.info('received all messages')
-        return tree
-
-    def _calculate_value(self, stop_event: Event, tree: TreeNode):
-        self._logger.info('started to calculate value')
-        stack: List[Tuple[TreeNode, int]] = [(tree, 0)]
-        while not stop_event.is_set() and len(stack) > 0:
-            subtree, i = stack.pop()
-            if i == 0 and subtree.children_count > 1:
-                subtrees = [(subtree_child, 0) for subtree_child in subtree if subtree_child.id != self._id]
-                stack += [(subtree, 1)] + subtrees
-            elif subtree.children_count == 1:
-                subtree[self._id].output_value = subtree[self._id].input_value
-            elif i > 0:
-                values = [subtree_child[self._id].output_value
-                          for subtree_child in subtree if subtree_child.id != self._id]
-                values.append(subtree[self._id].input_value)
-                counter = Counter(values)
-                true_count = counter.get(True, 0)
-                false_count = counter.get(False, 0)
-                if false_count >= true_count:
-                    value = False
-                else:
-                    value = True
-                subtree[self._id].output_value = value
-        self._value = tree[self._id].output_value
-        self._logger.info(f'calculated tree:\n{tree}')
+                        receive_time = time()
+                        batch: List[MessageData] = message.data
+                        for data in batch:
+                            received_messages += 1
+                            self._logger.info(f'received message ({received_messages}) from {message.src}: '
+                                              f'{data.value}, {data.path}')
+                            if tracker.value is None:
+                                tracker.add(data.path[1:], data.value)
+                                if tracker.value is not None:
+                                    self._value = tracker.value
+                                    self._logger.info(f'decided value {tracker.value} after {received_messages} of '
+                                                      f'{messages_count} messages')
+
+                            if data.m >= 0:
+                                self._add_value(rounds_batches.setdefault(data.m, {}), data.m - 1, data.value,
+                                                data.path)
+                                for lieutenant in self._neighbors:
+                                    if lieutenant not in data.path:
+                                        batch_key = (data.m, lieutenant)
+                                        relays_counts[batch_key] = relays_counts.get(batch_key, 0) + 1
+                                        batches_times.setdefault(batch_key, receive_time)
+
+            for (round_m, lieutenant), batch_time in list(batches_times.items()):
+                if (relays_counts[round_m, lieutenant] == rounds_relays_counts[round_m] or
+                        time() - batch_time >= self._batch_timeout):
+                    self._send_batches({lieutenant: rounds_batches[round_m].pop(lieutenant)})
+                    batches_times.pop((round_m, lieutenant))
+
+        for round_batches in rounds_batches.values():
+            self._send_batches(round_batches)
+
+        if received_messages < messages_count:
+            self._logger.info(f'stopped waiting for {messages_count - received_messages} messages')
+        else:
+            self._logger.info('received all messages')
+        return tracker
+
+    def _calculate_value(self, tracker: MajorityTracker):
+        if tracker.value is not None:
+            self._value = tracker.value
+        else:
+            self._logger.info('started to calculate value')
+            self._value = tracker.tree.calculate_majority()
+        if self._logger.isEnabledFor(DEBUG):
+            self._logger.debug(f'calculated tree:\n{tracker.tree.root}')
         self._logger.info(f'calculated value {self._value}')
 
     def run(self, stop_event: Event, m: int, *args):
@@ -114,8 +140,8 @@ class RouterLieutenant(Router):
             self._value = general_value
             return
 
-        tree = self._create_tree(stop_event, m, general_id, general_value)
-        self._calculate_value(stop_event, tree)
+        tracker = self._create_tree(stop_event, m, general_id, general_value)
+        self._calculate_value(tracker)
 
         while not stop_event.is_set() and any(link_output.not_empty() for link_output in self._links_outputs):
             sleep(self._sleep_time)
@@ -0,0 +1,18 @@
+from .message_data import SignedMessageData
+from .network_layer import LinkInput, LinkOutput
+from .router_general import RouterGeneral
+from .signer import KeyDirectory, Signer
+from typing import List
+
+
+class RouterSignedGeneral(RouterGeneral):
+    _signer: Signer
+
+    def __init__(self, id_: int, dr_link_input: LinkInput, dr_link_output: LinkOutput,
+                 lieutenants_links_outputs: List[LinkOutput], is_traitor: bool, topology_name: str,
+                 key_directory: KeyDirectory):
+        super().__init__(id_, dr_link_input, dr_link_output, lieutenants_links_outputs, is_traitor, topology_name)
+        self._signer = Signer(id_, key_directory)
+
+    def _create_data(self, m: int, value: bool, lieutenant_id: int) -> SignedMessageData:
+        return SignedMessageData(value, [self._id], [self._signer.sign(value)])
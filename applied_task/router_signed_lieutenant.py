@@ -0,0 +1,73 @@
+from .message_data import SignedMessageData
+from .network_layer import LinkInput, LinkOutput, Message, MessageType
+from .router_lieutenant import RouterLieutenant
+from .signer import KeyDirectory, Signer
+from multiprocessing import Event
+from random import randint
+from time import sleep, time
+from typing import List, Set
+
+
+class RouterSignedLieutenant(RouterLieutenant):
+    _signer: Signer
+    _values: Set[bool]
+    _quiet_time: float = 2
+
+    def __init__(self, id_: int, dr_link_input: LinkInput, dr_link_output: LinkOutput, general_link_input: LinkInput,
+                 lieutenants_links_inputs: List[LinkInput], lieutenants_links_outputs: List[LinkOutput],
+                 is_traitor: bool, topology_name: str, key_directory: KeyDirectory):
+        super().__init__(id_, dr_link_input, dr_link_output, general_link_input, lieutenants_links_inputs,
+                         lieutenants_links_outputs, is_traitor, topology_name)
+        self._signer = Signer(id_, key_directory)
+        self._values = set()
+
+    def _relay_value(self, data: SignedMessageData):
+        path = data.path + [self._id]
+        signatures = data.signatures + [self._signer.sign(data.value, data.signatures[-1])]
+        for lieutenant in filter(lambda l: l not in path, self._neighbors):
+            value = bool(randint(0, 1)) if self._is_traitor else data.value
+            message_out = Message(self._id, lieutenant, MessageType.DATA, SignedMessageData(value, path, signatures))
+            self._links_outputs[self._neighbors[lieutenant]].send(message_out)
+            self._logger.info(f'sent value to {lieutenant}: {value}, {path}')
+
+    def _receive_value(self, m: int, general_id: int, message: Message):
+        data: SignedMessageData = message.data
+        if (data.path[-1] != message.src or data.path[0] != general_id or self._id in data.path or
+                not self._signer.verify(data.value, data.path, data.signatures)):
+            self._logger.info(f'rejected value from {message.src}: {data.value}, {data.path}')
+            return
+        self._logger.info(f'received value from {message.src}: {data.value}, {data.path}')
+        if data.value not in self._values:
+            self._values.add(data.value)
+            if len(data.path) - 1 < m:
+                self._relay_value(data)
+
+    def run(self, stop_event: Event, m: int, *args):
+        self._start_links()
+        self._hello_stage(stop_event)
+
+        general_message = self._receive_general_message()
+        general_id = general_message.src
+        self._receive_value(m, general_id, general_message)
+
+        receive_time = time()
+        while not stop_event.is_set() and time() - receive_time < self._quiet_time:
+            is_need_sleep = True
+            for link_input in self._links_inputs:
+                if link_input.not_empty():
+                    message = link_input.receive()
+                    if message.type == MessageType.DATA:
+                        receive_time = time()
+                        self._receive_value(m, general_id, message)
+                    is_need_sleep = False
+
+            if is_need_sleep:
+                sleep(self._sleep_time)
+
+        self._value = next(iter(self._values)) if len(self._values) == 1 else False
+        self._logger.info(f'received values {sorted(self._values)}, calculated value {self._value}')
+
+        while not stop_event.is_set() and any(link_output.not_empty() for link_output in self._links_outputs):
+            sleep(self._sleep_time)
+
+        self._stop_links()
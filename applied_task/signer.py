@@ -0,0 +1,59 @@
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from multiprocessing import Array, Barrier
+from multiprocessing.sharedctypes import SynchronizedString
+from struct import Struct
+from typing import Dict, List, Optional
+
+
+_ID = Struct('<q')
+_PUBLIC_KEY_SIZE = 32
+
+
+class KeyDirectory:
+    _public_keys: List[SynchronizedString]
+    _barrier: Barrier
+
+    def __init__(self, ids_count: int):
+        self._public_keys = [Array('c', _PUBLIC_KEY_SIZE) for _ in range(ids_count)]
+        self._barrier = Barrier(ids_count)
+
+    def publish(self, id_: int, public_key: bytes) -> Dict[int, bytes]:
+        self._public_keys[id_].raw = public_key
+        self._barrier.wait()
+        return {key_id: key.raw for key_id, key in enumerate(self._public_keys)}
+
+
+class Signer:
+    _id: int
+    _private_key: Ed25519PrivateKey
+    _public_keys: Dict[int, Ed25519PublicKey]
+
+    def __init__(self, id_: int, key_directory: KeyDirectory):
+        self._id = id_
+        self._private_key = Ed25519PrivateKey.generate()
+        public_key = self._private_key.public_key().public_bytes_raw()
+        self._public_keys = {key_id: Ed25519PublicKey.from_public_bytes(key)
+                             for key_id, key in key_directory.publish(id_, public_key).items()}
+
+    @staticmethod
+    def _get_message(id_: int, value: bool, previous_signature: Optional[bytes]) -> bytes:
+        return (bytes([value]) if previous_signature is None else previous_signature) + _ID.pack(id_)
+
+    def sign(self, value: bool, previous_signature: Optional[bytes] = None) -> bytes:
+        return self._private_key.sign(self._get_message(self._id, value, previous_signature))
+
+    def verify(self, value: bool, path: List[int], signatures: List[bytes]) -> bool:
+        if len(path) == 0 or len(path) != len(signatures) or len(set(path)) != len(path):
+            return False
+        previous_signature = None
+        for id_, signature in zip(path, signatures):
+            public_key = self._public_keys.get(id_)
+            if public_key is None:
+                return False
+            try:
+                public_key.verify(signature, self._get_message(id_, value, previous_signature))
+            except InvalidSignature:
+                return False
+            previous_signature = signature
+        return True
@@ -1,29 +1,99 @@
-from typing import Dict, Iterator, Optional
+import numpy as np
 
+from array import array
+from typing import Dict, Iterator, List, Optional
 
-class TreeNode:
+
+def _encode_value(value: Optional[bool]) -> int:
+    return 0 if value is None else 1 + value
+
+
+def _decode_value(value: int) -> Optional[bool]:
+    return None if value == 0 else value == 2
+
+
+class Tree:
+    __slots__ = ('_root_id', '_id', '_ids', '_positions', '_offsets', '_block_sizes', '_input_values',
+                 '_output_values', '_children_counts')
+    _root_id: int
     _id: int
-    _input_value: bool
-    _output_value: Optional[bool]
-    _children: Dict[int, 'TreeNode']
+    _ids: List[int]
+    _positions: Dict[int, int]
+    _offsets: List[int]
+    _block_sizes: List[int]
+    _input_values: bytearray
+    _output_values: bytearray
+    _children_counts: array
+
+    def __init__(self, root_id: int, root_input_value: bool, ids: List[int], depth: int, id_: int):
+        self._root_id = root_id
+        self._id = id_
+        self._ids = sorted(ids)
+        other_ids = [other_id for other_id in self._ids if other_id != id_]
+        self._positions = {other_id: position for position, other_id in enumerate(other_ids)}
+        self._offsets = [0, 1]
+        self._block_sizes = []
+        levels_count = min(depth, len(self._ids))
+        parents_count = 1
+        for level in range(levels_count):
+            self._block_sizes.append(len(self._ids) - level if level + 1 < levels_count else 1)
+            self._offsets.append(self._offsets[-1] + parents_count * self._block_sizes[-1])
+            parents_count *= len(self._positions) - level
+        self._input_values = bytearray(self._offsets[-1])
+        self._output_values = bytearray(self._offsets[-1])
+        self._children_counts = array('I', [0]) * self._offsets[-1]
+        self._input_values[0] = _encode_value(root_input_value)
 
-    class TreeIterator:
-        _tree: 'TreeNode'
-        _iterator: Iterator
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def depth(self) -> int:
+        return len(self._offsets) - 2
+
+    @property
+    def size(self) -> int:
+        return self._offsets[-1]
 
-        def __init__(self, tree: 'TreeNode'):
-            self._tree = tree
-            self._iterator = iter(tree._children)
+    @property
+    def root(self) -> 'TreeNode':
+        return TreeNode(self, 0, 0, 0, 0, self._root_id)
+
+    def calculate_majority(self) -> bool:
+        input_values = np.frombuffer(self._input_values, dtype=np.uint8)
+        output_values = np.frombuffer(self._output_values, dtype=np.uint8)
+        values = np.zeros(0, dtype=bool)
+        for level in range(self.depth - 1, -1, -1):
+            block_size = self._block_sizes[level]
+            children_inputs = input_values[self._offsets[level + 1]:self._offsets[level + 2]].reshape(-1, block_size)
+            is_present = children_inputs != 0
+            votes = np.concatenate((values.reshape(len(children_inputs), block_size - 1), children_inputs[:, -1:] == 2),
+                                   axis=1)
+            votes &= is_present
+            values = 2 * votes.sum(axis=1) > is_present.sum(axis=1)
+            own_indices = np.flatnonzero(is_present[:, -1])
+            output_values[self._offsets[level + 1] + own_indices * block_size + block_size - 1] = \
+                1 + values[own_indices]
+        return bool(values[0])
 
-        def __next__(self) -> 'TreeNode':
-            return self._tree[self._iterator.__next__()]
 
-    def __init__(self, id_: int, input_value: bool, children: Optional[Dict[int, 'TreeNode']] = None,
-                 output_value: Optional[bool] = None):
+class TreeNode:
+    __slots__ = ('_tree', '_index', '_level', '_rank', '_used_positions', '_id')
+    _tree: Tree
+    _index: int
+    _level: int
+    _rank: int
+    _used_positions: int
+    _id: int
+
+    def __init__(self, tree: Tree, index: int, level: int, rank: int, used_positions: int, id_: int):
+        self._tree = tree
+        self._index = index
+        self._level = level
+        self._rank = rank
+        self._used_positions = used_positions
         self._id = id_
-        self._input_value = input_value
-        self._children = children if children is not None else {}
-        self._output_value = output_value
 
     @property
     def id(self) -> int:
@@ -31,48 +101,132 @@ class TreeNode:
 
     @property
     def input_value(self) -> bool:
-        return self._input_value
+        return _decode_value(self._tree._input_values[self._index])
 
     @property
     def children_count(self) -> int:
-        return len(self._children)
+        return self._tree._children_counts[self._index]
 
     @property
     def output_value(self) -> Optional[bool]:
-        return self._output_value
+        return _decode_value(self._tree._output_values[self._index])
 
     @output_value.setter
     def output_value(self, output_value: Optional[bool]):
-        self._output_value = output_value
-
-    def __getitem__(self, children_id: int) -> 'TreeNode':
-        if not isinstance(children_id, int):
+        self._tree._output_values[self._index] = _encode_value(output_value)
+
+    def _find_child(self, children_id: int) -> Optional['TreeNode']:
+        tree = self._tree
+        if self._rank < 0 or self._level >= tree.depth:
+            return None
+        block_size = tree._block_sizes[self._level]
+        start = tree._offsets[self._level + 1] + self._rank * block_size
+        if children_id == tree._id:
+            return TreeNode(tree, start + block_size - 1, self._level + 1, -1, self._used_positions, children_id)
+        position = tree._positions.get(children_id)
+        if position is None or self._used_positions >> position & 1 or self._level + 1 >= tree.depth:
+            return None
+        rank = position - bin(self._used_positions & ((1 << position) - 1)).count('1')
+        return TreeNode(tree, start + rank, self._level + 1, self._rank * (block_size - 1) + rank,
+                        self._used_positions | 1 << position, children_id)
+
+    def _child(self, children_id: int) -> 'TreeNode':
+        if __debug__ and not isinstance(children_id, int):
             raise TypeError(f'key must be integer, not {children_id.__class__}')
-        return self._children[children_id]
+        child = self._find_child(children_id)
+        if child is None:
+            raise KeyError(children_id)
+        return child
 
-    def __setitem__(self, children_id: int, tree: 'TreeNode'):
-        if not isinstance(children_id, int):
-            raise TypeError(f'key must be integer, not {children_id.__class__}')
-        if not isinstance(tree, TreeNode):
-            raise TypeError(f'value must be TreeNode, not {tree.__class__}')
-        self._children[children_id] = tree
+    def __getitem__(self, children_id: int) -> 'TreeNode':
+        child = self._child(children_id)
+        if self._tree._input_values[child._index] == 0:
+            raise KeyError(children_id)
+        return child
+
+    def setdefault(self, children_id: int, input_value: bool) -> 'TreeNode':
+        if __debug__ and not isinstance(input_value, bool):
+            raise TypeError(f'value must be bool, not {input_value.__class__}')
+        child = self._child(children_id)
+        if self._tree._input_values[child._index] == 0:
+            self._tree._input_values[child._index] = _encode_value(input_value)
+            self._tree._children_counts[self._index] += 1
+        return child
 
     def get(self, children_id: int, default: Optional['TreeNode'] = None) -> Optional['TreeNode']:
-        if not isinstance(children_id, int):
-            raise TypeError(f'key must be integer, not {children_id.__class__}')
-        if default is not None and not isinstance(default, TreeNode):
+        if __debug__ and default is not None and not isinstance(default, TreeNode):
             raise TypeError(f'default must be TreeNode, not {default.__class__}')
-        if children_id in self._children:
-            return self._children[children_id]
-        else:
+        try:
+            return self[children_id]
+        except KeyError:
             return default
 
-    def __iter__(self):
-        return self.TreeIterator(self)
+    def __iter__(self) -> Iterator['TreeNode']:
+        if self.children_count == 0:
+            return
+        for id_ in self._tree._ids:
+            child = self._find_child(id_)
+            if child is not None and self._tree._input_values[child._index] != 0:
+                yield child
 
     def __str__(self, level: int = 0):
         padding = '\t' * level
-        ret = f'{padding}{self._id}, {self._input_value}, {self._output_value}\n'
-        for child in self._children.values():
+        ret = f'{padding}{self._id}, {self.input_value}, {self.output_value}\n'
+        for child in self:
             ret += child.__str__(level + 1)
         return ret
+
+
+class MajorityTracker:
+    _tree: Tree
+    _true_counts: array
+    _false_counts: array
+    _decisions: bytearray
+
+    def __init__(self, tree: Tree):
+        self._tree = tree
+        self._true_counts = array('H', [0]) * tree.size
+        self._false_counts = array('H', [0]) * tree.size
+        self._decisions = bytearray(tree.size)
+
+    @property
+    def tree(self) -> Tree:
+        return self._tree
+
+    @property
+    def value(self) -> Optional[bool]:
+        return _decode_value(self._decisions[0])
+
+    def _vote(self, node: TreeNode, value: bool) -> Optional[bool]:
+        index = node._index
+        if value:
+            self._true_counts[index] += 1
+        else:
+            self._false_counts[index] += 1
+        votes_count = 1
+        if node._level < self._tree.depth - 1:
+            votes_count += len(self._tree._ids) - 1 - node._level
+        if 2 * self._true_counts[index] > votes_count:
+            return True
+        if 2 * self._false_counts[index] >= votes_count:
+            return False
+        return None
+
+    def add(self, path: List[int], value: bool):
+        if path[-1] != self._tree.id:
+            return
+        nodes = [self._tree.root]
+        for id_ in path[:-1]:
+            nodes.append(nodes[-1].setdefault(id_, value))
+        if nodes[-1].get(path[-1]) is not None:
+            return
+        nodes[-1].setdefault(path[-1], value)
+        for node in reversed(nodes):
+            if self._decisions[node._index] != 0:
+                return
+            decision = self._vote(node, value)
+            if decision is None:
+                return
+            self._decisions[node._index] = _encode_value(decision)
+            node._child(self._tree.id).output_value = decision
+            value = decision
@@ -4,37 +4,66 @@ import pandas as pd
 import pickle
 import plotly.express as px
 
-from applied_task.network_layer.link_layer import Connection, ProtocolT, RECEIVER, SENDER
+from applied_task.network_layer.link_layer import (BernoulliLoss, Channel, CONNECTION, CongestionWindow, Connection,
+                                                   ConnectionTypeT, GilbertElliottLoss, LossModel, ProtocolT, RECEIVER,
+                                                   SENDER, simulate)
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from math import ceil
 from multiprocessing import Array, Process, Value
 from multiprocessing.sharedctypes import Synchronized, SynchronizedString
 from time import time
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 
 
-def sender(message_to_send: str, window_size: int, connection: Connection, protocol: ProtocolT, k: Synchronized):
+RunnerT = Callable[..., Tuple[float, float, float, int]]
+LossT = Literal['bernoulli', 'gilbert_elliott']
+BURST_LENGTH = 4
+
+
+def gilbert_elliott_loss(probability: float) -> GilbertElliottLoss:
+    return GilbertElliottLoss(probability / (1 - probability) / BURST_LENGTH, 1 / BURST_LENGTH)
+
+
+LOSS: Dict[LossT, Callable[[float], LossModel]] = {
+    'bernoulli': BernoulliLoss,
+    'gilbert_elliott': gilbert_elliott_loss
+}
+
+
+def sender(message_to_send: str, window_size: int, connection: Connection, protocol: ProtocolT, segment_size: int,
+           adaptive_window: bool, k: Synchronized, rtt: Synchronized, retransmissions: Synchronized):
     function = SENDER[protocol]
     bytes_to_send = pickle.dumps(message_to_send)
-    sent_bytes = function(bytes_to_send, window_size, connection)
-    k.value = len(bytes_to_send) / sent_bytes
+    congestion_window = CongestionWindow(window_size) if adaptive_window else None
+    result = function(bytes_to_send, window_size, connection, segment_size, None, congestion_window)
+    k.value = ceil(len(bytes_to_send) / segment_size) / result.sent_packets
+    rtt.value = result.rtt if result.rtt is not None else float('nan')
+    retransmissions.value = result.retransmissions
 
 
-def receiver(transmission_error_probability: float, connection: Connection, protocol: ProtocolT,
-             received_message: SynchronizedString):
+def receiver(transmission_error_probability: float, connection: Connection, protocol: ProtocolT, segment_size: int,
+             ack_every: int, receive_window: int, received_message: SynchronizedString):
     function = RECEIVER[protocol]
-    received_bytes = function(transmission_error_probability, connection)
+    received_bytes = function(transmission_error_probability, connection, segment_size, ack_every, 0.005,
+                              receive_window)
     received_message.value = pickle.loads(received_bytes).encode()
 
 
 def run(message_to_send: str, window_size: int, transmission_error_probability: float,
-        protocol: ProtocolT) -> Tuple[float, float]:
-    connection = Connection()
+        protocol: ProtocolT, segment_size: int = 1, connection_type: ConnectionTypeT = 'queue',
+        ack_every: int = 1, adaptive_window: bool = False, receive_window: int = 0) -> Tuple[float, float, float, int]:
+    connection = CONNECTION[connection_type](segment_size)
     k = Value('d')
+    rtt = Value('d')
+    retransmissions = Value('i')
     received_message = Array('c', len(message_to_send))
 
-    sender_process = Process(target=sender, args=(message_to_send, window_size, connection, protocol, k))
+    sender_process = Process(target=sender, args=(message_to_send, window_size, connection, protocol, segment_size,
+                                                  adaptive_window, k, rtt, retransmissions))
     sender_process.daemon = True
     receiver_process = Process(target=receiver,
-                               args=(transmission_error_probability, connection, protocol, received_message))
+                               args=(transmission_error_probability, connection, protocol, segment_size, ack_every,
+                                     receive_window, received_message))
     receiver_process.daemon = True
 
     start = time()
@@ -43,10 +72,43 @@ def run(message_to_send: str, window_size: int, transmission_error_probability:
     sender_process.join()
     receiver_process.join()
     end = time()
+    connection.close()
 
-    print(f'Message to send and received message are equal: {message_to_send == received_message.value.decode()}')
+    print(f'Message to send and received message are equal: {message_to_send == received_message.value.decode()}, '
+          f'estimated RTT: {rtt.value}, retransmissions: {retransmissions.value}')
 
-    return k.value, end - start
+    return k.value, end - start, rtt.value, retransmissions.value
+
+
+def run_simulated(message_to_send: str, window_size: int, transmission_error_probability: float,
+                  protocol: ProtocolT, segment_size: int = 1, ack_every: int = 1, adaptive_window: bool = False,
+                  receive_window: int = 0, loss: Optional[LossT] = None,
+                  seed: Optional[int] = None) -> Tuple[float, float, float, int]:
+    bytes_to_send = pickle.dumps(message_to_send)
+    congestion_window = CongestionWindow(window_size) if adaptive_window else None
+    data_channel = None
+    if loss is not None:
+        data_channel = Channel(LOSS[loss](transmission_error_probability), seed=seed)
+        transmission_error_probability = 0
+    result, received_bytes, elapsed_time = simulate(bytes_to_send, window_size, transmission_error_probability,
+                                                    protocol, segment_size, ack_every, 0.005, congestion_window,
+                                                    receive_window, seed, data_channel=data_channel)
+
+    if received_bytes != bytes_to_send:
+        raise ValueError('received message is not equal to the message to send')
+    rtt = result.rtt if result.rtt is not None else float('nan')
+    return ceil(len(bytes_to_send) / segment_size) / result.sent_packets, elapsed_time, rtt, result.retransmissions
+
+
+def sweep(executor: ProcessPoolExecutor, runner: RunnerT, message_to_send: str, configurations: List[Dict[str, Any]],
+          tests_count: int) -> pd.DataFrame:
+    df = pd.DataFrame(columns=list(configurations[0]) + ['k', 'elapsed_time', 'rtt', 'retransmissions'])
+    futures = {executor.submit(runner, message_to_send, **configuration): configuration
+               for configuration in configurations for _ in range(tests_count)}
+    for future in as_completed(futures):
+        df.loc[len(df)] = {**futures[future], **dict(zip(['k', 'elapsed_time', 'rtt', 'retransmissions'],
+                                                         future.result()))}
+    return df
 
 
 def main():
@@ -55,20 +117,33 @@ def main():
     transmission_error_probabilities = np.linspace(0, 0.9, 20)
     window_sizes = list(range(1, 26))
     tests_count = 5
-    df_ws = pd.DataFrame(columns=['protocol', 'window_size', 'k', 'elapsed_time'])
-    df_tep = pd.DataFrame(columns=['protocol', 'transmission_error_probability', 'k', 'elapsed_time'])
     base_path = os.path.join('applied_task', 'network_layer', 'link_layer')
 
-    transmission_error_probability = 0.3
-    for protocol in protocols:
-        for window_size in window_sizes:
-            ks, elapsed_times = [], []
-            for _ in range(tests_count):
-                k, elapsed_time = run(message_to_send, window_size, transmission_error_probability, protocol)
-                ks.append(k)
-                elapsed_times.append(elapsed_time)
-            df_ws = df_ws.append(dict(protocol=protocol, window_size=window_size, k=np.mean(ks),
-                                      elapsed_time=np.mean(elapsed_times)), ignore_index=True)
+    ws_configurations = [dict(protocol=protocol, window_size=window_size, transmission_error_probability=0.3)
+                         for protocol in protocols for window_size in window_sizes]
+    tep_configurations = [dict(protocol=protocol, window_size=3, transmission_error_probability=probability)
+                          for protocol in protocols for probability in transmission_error_probabilities]
+    loss_configurations = [dict(protocol=protocol, window_size=window_size, transmission_error_probability=0.2,
+                                loss=loss) for protocol in protocols for window_size in window_sizes for loss in LOSS]
+    connection_configurations = [dict(protocol=protocol, window_size=window_size, transmission_error_probability=0.3,
+                                      connection_type=connection_type)
+                                 for protocol in protocols for window_size in window_sizes[::4]
+                                 for connection_type in CONNECTION]
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        df_ws = sweep(executor, run_simulated, message_to_send, ws_configurations, tests_count)
+        df_tep = sweep(executor, run_simulated, message_to_send, tep_configurations, tests_count)
+        df_loss = sweep(executor, run_simulated, message_to_send, loss_configurations, tests_count)
+        df_connection = sweep(executor, run, message_to_send, connection_configurations, tests_count)
+
+    df_ws = df_ws.groupby(['protocol', 'window_size'], as_index=False)[['k', 'elapsed_time', 'rtt',
+                                                                        'retransmissions']].mean()
+    df_tep = df_tep.groupby(['protocol', 'transmission_error_probability'],
+                            as_index=False)[['k', 'elapsed_time', 'rtt', 'retransmissions']].mean()
+    df_loss = df_loss.groupby(['protocol', 'loss', 'window_size'], as_index=False)[['k', 'elapsed_time', 'rtt',
+                                                                                   'retransmissions']].mean()
+    df_connection = df_connection.groupby(['protocol', 'connection_type', 'window_size'],
+                                          as_index=False)[['k', 'elapsed_time', 'rtt', 'retransmissions']].mean()
 
     fig_ws_k = px.line(df_ws[['protocol', 'window_size', 'k']], x='window_size', y='k', color='protocol')
     fig_ws_k.write_html(os.path.join(base_path, 'window_size_k.html'))
@@ -77,18 +152,6 @@ def main():
                                   color='protocol')
     fig_ws_elapsed_time.write_html(os.path.join(base_path, 'window_size_elapsed_time.html'))
 
-    window_size = 3
-    for protocol in protocols:
-        for transmission_error_probability in transmission_error_probabilities:
-            ks, elapsed_times = [], []
-            for _ in range(tests_count):
-                k, elapsed_time = run(message_to_send, window_size, transmission_error_probability, protocol)
-                ks.append(k)
-                elapsed_times.append(elapsed_time)
-            df_tep = df_tep.append(dict(protocol=protocol, k=np.mean(ks), elapsed_time=np.mean(elapsed_times),
-                                        transmission_error_probability=transmission_error_probability),
-                                   ignore_index=True)
-
     fig_tep_k = px.line(df_tep[['protocol', 'transmission_error_probability', 'k']], x='transmission_error_probability',
                         y='k', color='protocol')
     fig_tep_k.write_html(os.path.join(base_path, 'transmission_error_probability_k.html'))
@@ -97,6 +160,19 @@ def main():
                                    x='transmission_error_probability', y='elapsed_time', color='protocol')
     fig_tep_elapsed_time.write_html(os.path.join(base_path, 'transmission_error_probability_elapsed_time.html'))
 
+    fig_loss_k = px.line(df_loss[['protocol', 'loss', 'window_size', 'k']], x='window_size', y='k', color='protocol',
+                         line_dash='loss')
+    fig_loss_k.write_html(os.path.join(base_path, 'loss_window_size_k.html'))
+
+    fig_loss_elapsed_time = px.line(df_loss[['protocol', 'loss', 'window_size', 'elapsed_time']], x='window_size',
+                                    y='elapsed_time', color='protocol', line_dash='loss')
+    fig_loss_elapsed_time.write_html(os.path.join(base_path, 'loss_window_size_elapsed_time.html'))
+
+    fig_connection_elapsed_time = px.line(df_connection[['protocol', 'connection_type', 'window_size', 'elapsed_time']],
+                                          x='window_size', y='elapsed_time', color='protocol',
+                                          line_dash='connection_type')
+    fig_connection_elapsed_time.write_html(os.path.join(base_path, 'connection_type_window_size_elapsed_time.html'))
+
 
 if __name__ == '__main__':
     main()
@@ -1,3 +1,5 @@
+import asyncio
+
 from applied_task.network_layer import DesignatedRouter, get_link, LinkInput, LinkOutput, Router
 from functools import partial
 from multiprocessing import Event, Process
@@ -10,35 +12,44 @@ SLEEP_TIME = 180
 
 def run_router(stop_event: Event, topology_name: str, id_: int, dr_link_input: LinkInput,
                dr_link_output: LinkOutput, links_inputs: List[LinkInput], links_outputs: List[LinkOutput],
-               send_event: Event):
+               send_event: Event, is_async: bool = False):
     router = Router(id_, dr_link_input, dr_link_output, links_inputs, links_outputs, topology_name)
-    router.run(stop_event, send_event)
+    if is_async:
+        asyncio.run(router.run_async(stop_event, send_event))
+    else:
+        router.run(stop_event, send_event)
 
 
 def run_designated_router(stop_event: Event, connection_off_event: Event, topology_name: str,
-                          links_inputs: List[LinkInput], links_outputs: List[LinkOutput],
-                          disconnection_probabilities: List[float]):
-    router = DesignatedRouter(-1, links_inputs, links_outputs, disconnection_probabilities, topology_name)
-    router.run(stop_event, connection_off_event)
-
-
-def ospf(topology: List[Tuple[List[int], float]], name: str):
+                          is_routing_precomputed: bool, links_inputs: List[LinkInput],
+                          links_outputs: List[LinkOutput], disconnection_probabilities: List[float],
+                          is_async: bool = False):
+    router = DesignatedRouter(-1, links_inputs, links_outputs, disconnection_probabilities, topology_name,
+                              is_routing_precomputed=is_routing_precomputed)
+    if is_async:
+        asyncio.run(router.run_async(stop_event, connection_off_event))
+    else:
+        router.run(stop_event, connection_off_event)
+
+
+def ospf(topology: List[Tuple[List[int], float]], name: str, is_routing_precomputed: bool = False,
+         is_async: bool = False):
     stop_event = Event()
     send_events = [Event() for _ in range(len(topology))]
     connection_off_event = Event()
 
     router_runner = partial(run_router, stop_event, name)
-    dr_runner = partial(run_designated_router, stop_event, connection_off_event, name)
+    dr_runner = partial(run_designated_router, stop_event, connection_off_event, name, is_routing_precomputed)
 
-    dr_router_links: List[Tuple[LinkOutput, LinkInput]] = [get_link() for _ in range(len(topology))]
-    router_dr_links: List[Tuple[LinkOutput, LinkInput]] = [get_link() for _ in range(len(topology))]
+    dr_router_links: List[Tuple[LinkOutput, LinkInput]] = [get_link(is_async=is_async) for _ in range(len(topology))]
+    router_dr_links: List[Tuple[LinkOutput, LinkInput]] = [get_link(is_async=is_async) for _ in range(len(topology))]
 
     links_inputs: List[List[LinkInput]] = [[] for _ in range(len(topology))]
     links_outputs: List[List[LinkOutput]] = [[] for _ in range(len(topology))]
 
     for node, (neighbors, _) in enumerate(topology):
         for neighbor in neighbors:
-            link_output, link_input = get_link()
+            link_output, link_input = get_link(is_async=is_async)
             links_outputs[node].append(link_output)
             links_inputs[neighbor].append(link_input)
 
@@ -46,11 +57,12 @@ def ospf(topology: List[Tuple[List[int], float]], name: str):
 
     routers_processes = [Process(target=router_runner,
                                  args=(node, dr_router_links[node][1], router_dr_links[node][0], links_inputs[node],
-                                       links_outputs[node], send_events[node]))
+                                       links_outputs[node], send_events[node], is_async))
                          for node in range(len(topology))]
     dr_process = Process(target=dr_runner,
                          args=([router_dr_links[i][1] for i in range(len(topology))],
-                               [dr_router_links[i][0] for i in range(len(topology))], disconnection_probabilities))
+                               [dr_router_links[i][0] for i in range(len(topology))], disconnection_probabilities,
+                               is_async))
     processes = routers_processes + [dr_process]
 
     for process in processes:
@@ -69,6 +81,11 @@ def ospf(topology: List[Tuple[List[int], float]], name: str):
     stop_event.set()
     for process in processes:
         process.join()
+    for link_output, _ in dr_router_links + router_dr_links:
+        link_output.close()
+    for node_links_outputs in links_outputs:
+        for link_output in node_links_outputs:
+            link_output.close()
 
 
 def main():
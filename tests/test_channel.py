@@ -0,0 +1,74 @@
+import pytest
+
+from applied_task.network_layer.link_layer import (BernoulliLoss, Channel, ChannelConnection, GilbertElliottLoss,
+                                                   LossModel, Packet, QueueConnection)
+from random import Random
+
+
+def test_default_channel_delivers_once():
+    channel = Channel()
+    assert all(channel.transmit() == [0] for _ in range(100))
+
+
+def test_same_seed_gives_same_delays():
+    def make_channel() -> Channel:
+        return Channel(GilbertElliottLoss(0.1, 0.3, 0.05), 0.001, 0.004, 0.2, 0.2, seed=5)
+
+    first, second = make_channel(), make_channel()
+    assert [first.transmit() for _ in range(1000)] == [second.transmit() for _ in range(1000)]
+
+
+def test_delays_stay_in_bounds():
+    channel = Channel(delay=0.002, jitter=0.003, reordering_probability=0.5, reordering_delay=0.01, seed=1)
+    delays = [delay for _ in range(1000) for delay in channel.transmit()]
+    assert len(delays) == 1000
+    reordered = [delay for delay in delays if delay > 0.005]
+    assert all(0.002 <= delay <= 0.005 for delay in delays if delay <= 0.005)
+    assert all(0.012 <= delay <= 0.015 for delay in reordered)
+    assert 400 < len(reordered) < 600
+
+
+def test_duplication():
+    assert all(len(Channel(duplication_probability=1, seed=2).transmit()) == 2 for _ in range(10))
+    channel = Channel(duplication_probability=0.25, seed=2)
+    copies_count = sum(len(channel.transmit()) for _ in range(4000))
+    assert 4800 < copies_count < 5200
+
+
+@pytest.mark.parametrize('probability', [0, 0.1, 0.5, 1])
+def test_bernoulli_loss_rate(probability):
+    channel = Channel(BernoulliLoss(probability), seed=3)
+    lost_count = sum(len(channel.transmit()) == 0 for _ in range(10000))
+    assert abs(lost_count - 10000 * probability) <= 300
+
+
+def test_gilbert_elliott_loss_comes_in_bursts():
+    loss = GilbertElliottLoss(0.02, 0.2)
+    random_ = Random(4)
+    losses = [loss.is_lost(random_) for _ in range(50000)]
+    bursts = ''.join('x' if is_lost else ' ' for is_lost in losses).split()
+    assert abs(sum(losses) / len(losses) - 0.02 / (0.02 + 0.2)) < 0.02
+    assert 4 < sum(map(len, bursts)) / len(bursts) < 6
+
+
+def test_gilbert_elliott_loss_states():
+    random_ = Random(5)
+    assert not any(GilbertElliottLoss(0, 1).is_lost(random_) for _ in range(100))
+    always_bad = GilbertElliottLoss(1, 0)
+    assert all(always_bad.is_lost(random_) for _ in range(100))
+    assert not any(LossModel().is_lost(random_) for _ in range(100))
+
+
+def test_channel_connection_duplicates_packets_and_acks():
+    connection = ChannelConnection(QueueConnection(), Channel(duplication_probability=1, delay=0.01),
+                                   Channel(BernoulliLoss(1)))
+    try:
+        connection.send(Packet(0, b'data'))
+        first = connection.receive_send(1)
+        second = connection.receive_send(1)
+        assert (first.id, first.data) == (second.id, second.data) == (0, b'data')
+        assert connection.receive_send(0.05) is None
+        connection.ack(0)
+        assert connection.receive_ack(0.05) is None
+    finally:
+        connection.close()
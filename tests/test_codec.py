@@ -0,0 +1,149 @@
+import pytest
+
+from applied_task.message_data import MessageData, SignedMessageData
+from applied_task.network_layer.codec import (decode_message, decode_value, encode_message, encode_value, HEADER,
+                                              register_type, VERSION)
+from applied_task.network_layer.link_layer import Ack, decode_ack, decode_packet, encode_ack, encode_packet, Packet
+from applied_task.network_layer.message import (Message, MessageHelloDataT, MessageNextHopsDataT, MessageTopologyDataT,
+                                                MessageTopologyUpdateDataT, MessageType)
+from applied_task.network_layer.topology import Topology
+
+
+def _make_topology() -> Topology:
+    topology = Topology()
+    topology.add_node(7)
+    topology.add_edge(0, 1, 1.5)
+    topology.add_edge(1, 2, 2)
+    topology.add_edge(2, 0, 0.25)
+    return topology
+
+
+def _round_trip(message: Message) -> Message:
+    decoded = decode_message(encode_message(message))
+    assert (decoded.src, decoded.dst, decoded.type) == (message.src, message.dst, message.type)
+    return decoded
+
+
+@pytest.mark.parametrize('value', [None, True, False, 0, -1, 2 ** 62, 0.5, float('inf'), '', 'héllo', b'',
+                                   b'\x00\xff', [], [1, 2, 3], [1, 'a', None], (), (1, (2.5, [3])), {},
+                                   {1: [2, 3], 'a': {'b': b'c'}}])
+def test_value_round_trip(value):
+    decoded = decode_value(encode_value(value))
+    assert decoded == value
+    assert type(decoded) is type(value)
+
+
+def test_bool_is_not_decoded_as_int():
+    assert decode_value(encode_value([True, 1])) == [True, 1]
+    assert type(decode_value(encode_value([True, 1]))[0]) is bool
+
+
+@pytest.mark.parametrize('type_', list(MessageType))
+@pytest.mark.parametrize('dst', [None, 0, 5])
+def test_message_header_round_trip(type_, dst):
+    assert _round_trip(Message(3, dst, type_, None)).data is None
+
+
+def test_data_path_round_trip():
+    decoded = _round_trip(Message(1, 4, MessageType.DATA, [1, 2, 3, 4]))
+    assert decoded.data == [1, 2, 3, 4]
+
+
+def test_hello_round_trip():
+    decoded = _round_trip(Message(1, None, MessageType.HELLO, MessageHelloDataT(1, 123.25)))
+    assert type(decoded.data) is MessageHelloDataT
+    assert (decoded.data.id, decoded.data.start_time) == (1, 123.25)
+
+
+def test_topology_round_trip():
+    topology = _make_topology()
+    decoded = _round_trip(Message(-1, 2, MessageType.SET_TOPOLOGY, topology)).data
+    assert type(decoded) is Topology
+    assert sorted(decoded.get_nodes()) == sorted(topology.get_nodes())
+    assert sorted(decoded.get_edges()) == sorted(topology.get_edges())
+
+
+def test_topology_data_round_trip():
+    decoded = _round_trip(Message(-1, 2, MessageType.SET_TOPOLOGY, MessageTopologyDataT(9, _make_topology()))).data
+    assert type(decoded) is MessageTopologyDataT
+    assert decoded.sequence_number == 9
+    assert sorted(decoded.topology.get_edges()) == sorted(_make_topology().get_edges())
+
+
+def test_topology_update_round_trip():
+    update = MessageTopologyUpdateDataT(4, [3], [(0, 1)], [(1, 2, 0.5), (2, 1, 3)])
+    decoded = _round_trip(Message(-1, 2, MessageType.UPDATE_TOPOLOGY, update)).data
+    assert type(decoded) is MessageTopologyUpdateDataT
+    assert decoded.sequence_number == 4
+    assert decoded.removed_nodes == [3]
+    assert [tuple(edge) for edge in decoded.removed_edges] == [(0, 1)]
+    assert [tuple(edge) for edge in decoded.added_edges] == [(1, 2, 0.5), (2, 1, 3)]
+
+
+def test_next_hops_round_trip():
+    next_hops = MessageNextHopsDataT(2, {1: [1], 2: [1, 3], 3: []})
+    decoded = _round_trip(Message(-1, 0, MessageType.SET_NEXT_HOPS, next_hops)).data
+    assert type(decoded) is MessageNextHopsDataT
+    assert (decoded.sequence_number, decoded.next_hops) == (2, {1: [1], 2: [1, 3], 3: []})
+
+
+def test_message_data_round_trip():
+    decoded = _round_trip(Message(0, 3, MessageType.DATA, MessageData(2, True, [0, 1]))).data
+    assert type(decoded) is MessageData
+    assert (decoded.m, decoded.value, decoded.path) == (2, True, [0, 1])
+
+
+def test_signed_message_data_round_trip():
+    data = SignedMessageData(False, [0, 2], [b'\x01' * 64, b'\x02' * 64])
+    decoded = _round_trip(Message(2, 3, MessageType.DATA, data)).data
+    assert type(decoded) is SignedMessageData
+    assert (decoded.value, decoded.path, decoded.signatures) == (False, [0, 2], [b'\x01' * 64, b'\x02' * 64])
+
+
+def test_version_mismatch_is_rejected():
+    bytes_ = bytearray(encode_message(Message(1, 2, MessageType.DATA, [1, 2])))
+    assert bytes_[0] == VERSION
+    bytes_[0] = VERSION + 1
+    with pytest.raises(ValueError, match='version'):
+        decode_message(bytes(bytes_))
+
+
+def test_trailing_bytes_are_rejected():
+    with pytest.raises(ValueError, match='trailing'):
+        decode_message(encode_message(Message(1, 2, MessageType.DATA, 'x')) + b'\x00')
+
+
+def test_unknown_tag_is_rejected():
+    bytes_ = bytearray(encode_message(Message(1, 2, MessageType.DATA, None)))
+    bytes_[HEADER.size] = 255
+    with pytest.raises(ValueError, match='unknown tag'):
+        decode_message(bytes(bytes_))
+
+
+def test_unregistered_type_is_rejected():
+    with pytest.raises(TypeError):
+        encode_message(Message(1, 2, MessageType.DATA, object()))
+
+
+@pytest.mark.parametrize('tag', [0, 31, 256])
+def test_register_type_rejects_reserved_tags(tag):
+    with pytest.raises(ValueError):
+        register_type(type('Reserved', (), {}), tag, lambda value: None, lambda value: None)
+
+
+def test_register_type_rejects_duplicates():
+    with pytest.raises(ValueError):
+        register_type(type('Duplicate', (), {}), 64, lambda value: None, lambda value: None)
+    with pytest.raises(ValueError):
+        register_type(MessageData, 200, lambda value: None, lambda value: None)
+
+
+def test_packet_round_trip():
+    decoded = decode_packet(encode_packet(Packet(5, b'payload', 1000, 3)))
+    assert (decoded.id, decoded.data, decoded.total_size, decoded.transfer_id) == (5, b'payload', 1000, 3)
+
+
+def test_ack_round_trip():
+    decoded = decode_ack(encode_ack(Ack(-1, 2 ** 63 + 5, True, 7, 3)))
+    assert (decoded.id, decoded.sack, decoded.is_cumulative, decoded.receive_window, decoded.transfer_id) == \
+        (-1, 2 ** 63 + 5, True, 7, 3)
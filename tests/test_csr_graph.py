@@ -0,0 +1,89 @@
+import networkx as nx
+import pytest
+
+from applied_task.network_layer.csr_graph import CsrGraph
+from networkx import DiGraph
+from queue import PriorityQueue
+from random import Random
+from typing import Dict, List
+
+
+def _baseline_shortest_ways(graph: DiGraph, root_node: int) -> Dict[int, List[int]]:
+    ways = {node: [] for node in graph}
+    ways[root_node] = [root_node]
+
+    distances = {node: float('inf') for node in graph}
+    distances[root_node] = 0
+
+    queue = PriorityQueue()
+    queue.put((0, root_node))
+
+    unvisited = set(graph)
+
+    while not queue.empty():
+        (distance, node) = queue.get()
+        if node not in unvisited:
+            continue
+        unvisited.remove(node)
+
+        for neighbor, attrs in graph[node].items():
+            if neighbor in unvisited:
+                new_cost = distance + attrs['weight']
+                if new_cost < distances[neighbor]:
+                    queue.put((new_cost, neighbor))
+                    distances[neighbor] = new_cost
+                    ways[neighbor] = ways[node] + [neighbor]
+
+    return ways
+
+
+def _make_random_graph(random_: Random, nodes_count: int, edges_count: int, weights: List[float]) -> DiGraph:
+    graph = DiGraph()
+    graph.add_nodes_from(random_.sample(range(10 * nodes_count), nodes_count))
+    nodes = list(graph)
+    for _ in range(edges_count):
+        src, dst = random_.sample(nodes, 2)
+        graph.add_edge(src, dst, weight=random_.choice(weights))
+    return graph
+
+
+def _get_cost(graph: DiGraph, way: List[int]) -> float:
+    return sum(graph[src][dst]['weight'] for src, dst in zip(way, way[1:]))
+
+
+@pytest.mark.parametrize('seed', range(30))
+@pytest.mark.parametrize('weights', [[1, 2, 3], [0.25, 0.5, 1.75, 4]])
+def test_shortest_ways_match_baseline(seed, weights):
+    random_ = Random(seed)
+    graph = _make_random_graph(random_, random_.randint(2, 30), random_.randint(0, 90), weights)
+    csr_graph = CsrGraph(graph)
+    for root_node in graph:
+        distances, predecessors = csr_graph.get_shortest_ways(root_node, 1e-9)
+        baseline_ways = _baseline_shortest_ways(graph, root_node)
+        baseline_predecessors, baseline_distances = nx.dijkstra_predecessor_and_distance(graph, root_node)
+        for node, way in baseline_ways.items():
+            index = csr_graph.indices[node]
+            if len(way) == 0:
+                assert distances[index] == float('inf')
+                assert predecessors[index] == []
+                continue
+            assert distances[index] == _get_cost(graph, way) == baseline_distances[node]
+            assert sorted(csr_graph.nodes[predecessor] for predecessor in predecessors[index]) == \
+                sorted(baseline_predecessors[node])
+            if node != root_node:
+                assert csr_graph.indices[way[-2]] in predecessors[index]
+
+
+def test_layout_follows_graph_order():
+    graph = DiGraph()
+    graph.add_nodes_from([5, 3, 9])
+    graph.add_edge(5, 9, weight=2)
+    graph.add_edge(5, 3, weight=1)
+    graph.add_edge(9, 5, weight=4)
+    csr_graph = CsrGraph(graph)
+    assert csr_graph.nodes == [5, 3, 9]
+    assert csr_graph.indices == {5: 0, 3: 1, 9: 2}
+    assert csr_graph.offsets == [0, 2, 2, 3]
+    assert csr_graph.targets == [2, 1, 0]
+    assert csr_graph.weights == [2, 1, 4]
+    assert csr_graph.get_shortest_ways(9, 1e-9) == ([4, 5, 0], [[2], [0], []])
@@ -0,0 +1,32 @@
+import pytest
+
+from applied_task.network_layer.forwarding_table import ArrayForwardingTable, ForwardingTable, get_forwarding_table
+
+
+_NEXT_HOPS = {1: [1], 2: [2], 3: [1, 2], 4: [], 5: [6]}
+_NEIGHBORS = {1: 10, 2: 20}
+
+
+@pytest.mark.parametrize('table_type', [ForwardingTable, ArrayForwardingTable])
+def test_equal_cost_links_are_picked_by_flow_hash(table_type):
+    table = table_type(_NEXT_HOPS, _NEIGHBORS)
+    assert table.to_dict() == {1: [10], 2: [20], 3: [10, 20], 4: [], 5: []}
+    assert {table.get_link(3, flow_hash) for flow_hash in range(8)} == {10, 20}
+    assert table.get_link(3, hash((0, 3))) == table.get_link(3, hash((0, 3)))
+    assert table.get_link(1, 7) == 10
+    assert table.get_link(4) == -1
+    assert table.get_link(5) == -1
+    assert table.get_link(42) == -1
+
+
+def test_tables_agree():
+    table = ForwardingTable(_NEXT_HOPS, _NEIGHBORS)
+    array_table = ArrayForwardingTable(_NEXT_HOPS, _NEIGHBORS)
+    for node in range(-1, 8):
+        for flow_hash in range(-3, 4):
+            assert table.get_link(node, flow_hash) == array_table.get_link(node, flow_hash)
+
+
+def test_sparse_ids_use_dict_table():
+    assert type(get_forwarding_table(_NEXT_HOPS, _NEIGHBORS)) is ArrayForwardingTable
+    assert type(get_forwarding_table({10 ** 6: [1]}, _NEIGHBORS)) is ForwardingTable
@@ -0,0 +1,87 @@
+import pytest
+
+from applied_task.network_layer.link_layer import BernoulliLoss, Channel, CongestionWindow, GilbertElliottLoss, simulate
+from random import Random
+
+
+_PROTOCOLS = ['go_back_n', 'selective_repeat']
+
+
+def _make_bytes(seed: int, size: int) -> bytes:
+    return Random(seed).randbytes(size)
+
+
+@pytest.mark.parametrize('protocol', _PROTOCOLS)
+@pytest.mark.parametrize('size, segment_size', [(0, 64), (1, 64), (64, 64), (5000, 64), (3001, 100), (200, 1)])
+def test_lossless_transfer(protocol, size, segment_size):
+    bytes_to_send = _make_bytes(size, size)
+    result, received_bytes, elapsed = simulate(bytes_to_send, 16, 0, protocol, segment_size)
+    assert received_bytes == bytes_to_send
+    assert result.sent_packets == -(-size // segment_size)
+    assert result.retransmissions == 0
+    assert elapsed < 1
+
+
+@pytest.mark.parametrize('protocol', _PROTOCOLS)
+@pytest.mark.parametrize('transmission_error_probability', [0.05, 0.2, 0.3])
+@pytest.mark.parametrize('seed', range(5))
+def test_lossy_transfer(protocol, transmission_error_probability, seed):
+    bytes_to_send = _make_bytes(seed, 3000)
+    result, received_bytes, _ = simulate(bytes_to_send, 8, transmission_error_probability, protocol, 64, seed=seed)
+    assert received_bytes == bytes_to_send
+    assert result.sent_packets > 3000 // 64
+    assert result.retransmissions == result.sent_packets - -(-3000 // 64)
+
+
+@pytest.mark.parametrize('protocol', _PROTOCOLS)
+@pytest.mark.parametrize('ack_every, receive_window', [(1, 0), (4, 0), (1, 3), (3, 5)])
+def test_delayed_acks_and_receive_window(protocol, ack_every, receive_window):
+    bytes_to_send = _make_bytes(ack_every, 4000)
+    _, received_bytes, _ = simulate(bytes_to_send, 16, 0.1, protocol, 50, ack_every, 0.002,
+                                    receive_window=receive_window, seed=ack_every)
+    assert received_bytes == bytes_to_send
+
+
+@pytest.mark.parametrize('protocol', _PROTOCOLS)
+def test_congestion_window(protocol):
+    bytes_to_send = _make_bytes(7, 4000)
+    _, received_bytes, _ = simulate(bytes_to_send, 32, 0.1, protocol, 50, congestion_window=CongestionWindow(32),
+                                    seed=7)
+    assert received_bytes == bytes_to_send
+
+
+@pytest.mark.parametrize('protocol', _PROTOCOLS)
+def test_same_seed_gives_same_run(protocol):
+    bytes_to_send = _make_bytes(3, 2000)
+    runs = [simulate(bytes_to_send, 8, 0.2, protocol, 32, seed=3) for _ in range(2)]
+    (first, _, first_elapsed), (second, _, second_elapsed) = runs
+    assert (first.sent_packets, first.retransmissions, first_elapsed) == \
+        (second.sent_packets, second.retransmissions, second_elapsed)
+
+
+def test_selective_repeat_retransmits_less_than_go_back_n():
+    bytes_to_send = _make_bytes(11, 5000)
+    go_back_n, _, _ = simulate(bytes_to_send, 16, 0.1, 'go_back_n', 64, seed=11)
+    selective_repeat, _, _ = simulate(bytes_to_send, 16, 0.1, 'selective_repeat', 64, seed=11)
+    assert selective_repeat.retransmissions < go_back_n.retransmissions
+
+
+@pytest.mark.parametrize('protocol', _PROTOCOLS)
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('make_data_channel, make_ack_channel', [
+    (lambda seed: Channel(BernoulliLoss(0.2), seed=seed), lambda seed: Channel(BernoulliLoss(0.2), seed=seed)),
+    (lambda seed: Channel(GilbertElliottLoss(0.05, 0.3), seed=seed),
+     lambda seed: Channel(GilbertElliottLoss(0.05, 0.5), seed=seed)),
+    (lambda seed: Channel(duplication_probability=0.5, seed=seed),
+     lambda seed: Channel(duplication_probability=0.5, seed=seed)),
+    (lambda seed: Channel(reordering_probability=0.3, reordering_delay=0.005, seed=seed),
+     lambda seed: Channel(reordering_probability=0.3, seed=seed)),
+    (lambda seed: Channel(jitter=0.004, seed=seed), lambda seed: Channel(jitter=0.002, seed=seed)),
+    (lambda seed: Channel(BernoulliLoss(0.1), 0.001, 0.004, 0.2, 0.2, seed=seed),
+     lambda seed: Channel(BernoulliLoss(0.2), 0.001, 0.003, 0.3, seed=seed)),
+])
+def test_transfer_over_channels(protocol, seed, make_data_channel, make_ack_channel):
+    bytes_to_send = _make_bytes(seed, 3000)
+    _, received_bytes, _ = simulate(bytes_to_send, 8, 0, protocol, 64, seed=seed,
+                                    data_channel=make_data_channel(seed), ack_channel=make_ack_channel(seed + 100))
+    assert received_bytes == bytes_to_send
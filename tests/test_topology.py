@@ -0,0 +1,165 @@
+import networkx as nx
+import pytest
+
+from applied_task.network_layer.topology import Topology
+from random import Random
+from typing import List, Tuple
+
+
+_WEIGHTS = (0.5, 1, 1.5, 2, 2.5)
+
+
+def _make_topology(nodes: List[int], edges: List[Tuple[int, int, float]]) -> Topology:
+    topology = Topology()
+    for node in nodes:
+        topology.add_node(node)
+    for src, dst, weight in edges:
+        topology.add_edge(src, dst, weight)
+    return topology
+
+
+def _make_random_topology(random_: Random, nodes_count: int, edges_count: int) -> Topology:
+    topology = _make_topology(list(range(nodes_count)), [])
+    for _ in range(edges_count):
+        src, dst = random_.sample(range(nodes_count), 2)
+        topology.add_edge(src, dst, random_.choice(_WEIGHTS))
+    return topology
+
+
+def _assert_matches_recompute(topology: Topology, roots: List[int]):
+    fresh = _make_topology(topology.get_nodes(), topology.get_edges())
+    for root in roots:
+        assert topology.get_shortest_ways(root) == fresh.get_shortest_ways(root)
+        assert topology.get_next_hops(root) == fresh.get_next_hops(root)
+
+
+def _get_distance(topology: Topology, src: int, dst: int) -> float:
+    way = topology.get_shortest_way(src, dst)
+    if len(way) == 0:
+        return float('inf')
+    return sum(topology.get_weight(way_src, way_dst) for way_src, way_dst in zip(way, way[1:]))
+
+
+def _mutate(random_: Random, topology: Topology, next_node: int) -> int:
+    nodes = topology.get_nodes()
+    edges = topology.get_edges()
+    operation = random_.random()
+    if operation < 0.1:
+        topology.add_node(next_node)
+        return next_node + 1
+    if operation < 0.2 and len(nodes) > 2:
+        topology.remove_node(random_.choice(nodes))
+    elif operation < 0.5 and len(edges) > 0:
+        src, dst, _ = random_.choice(edges)
+        topology.remove_edge(src, dst)
+    elif operation < 0.7 and len(edges) > 0:
+        src, dst, _ = random_.choice(edges)
+        topology.add_edge(src, dst, random_.choice(_WEIGHTS))
+    elif len(nodes) > 1:
+        src, dst = random_.sample(nodes, 2)
+        topology.add_edge(src, dst, random_.choice(_WEIGHTS))
+    return next_node
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_incremental_updates_match_recompute(seed):
+    random_ = Random(seed)
+    topology = _make_random_topology(random_, 12, 30)
+    next_node = 12
+    for _ in range(60):
+        next_node = _mutate(random_, topology, next_node)
+        _assert_matches_recompute(topology, topology.get_nodes())
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_update_matches_recompute(seed):
+    random_ = Random(seed)
+    topology = _make_random_topology(random_, 10, 25)
+    _assert_matches_recompute(topology, topology.get_nodes())
+    for _ in range(10):
+        target = _make_random_topology(random_, random_.randint(6, 12), random_.randint(10, 30))
+        topology.update(target)
+        assert sorted(topology.get_nodes()) == sorted(target.get_nodes())
+        assert sorted(topology.get_edges()) == sorted(target.get_edges())
+        _assert_matches_recompute(topology, topology.get_nodes())
+
+
+def test_removed_edge_is_bypassed():
+    topology = _make_topology([0, 1, 2, 3], [(0, 1, 1), (1, 2, 1), (0, 3, 2), (3, 2, 2)])
+    assert topology.get_shortest_way(0, 2) == [0, 1, 2]
+    topology.remove_edge(1, 2)
+    assert topology.get_shortest_way(0, 2) == [0, 3, 2]
+    topology.remove_node(3)
+    assert topology.get_shortest_way(0, 2) == []
+    assert topology.get_shortest_ways(0) == {1: [0], 2: []}
+
+
+def test_cheaper_edge_replaces_shortest_way():
+    topology = _make_topology([0, 1, 2], [(0, 1, 1), (1, 2, 1), (0, 2, 5)])
+    assert topology.get_shortest_ways(0) == {1: [0], 2: [1]}
+    topology.add_edge(0, 2, 1)
+    assert topology.get_shortest_ways(0) == {1: [0], 2: [0]}
+    topology.add_edge(0, 2, 3)
+    assert topology.get_shortest_ways(0) == {1: [0], 2: [1]}
+
+
+def test_equal_cost_ways_keep_every_predecessor():
+    topology = _make_topology([0, 1, 2, 3], [(0, 1, 1), (0, 2, 1), (1, 3, 1), (2, 3, 1)])
+    assert topology.get_shortest_ways(0) == {1: [0], 2: [0], 3: [1, 2]}
+    assert topology.get_next_hops(0) == {1: [1], 2: [2], 3: [1, 2]}
+    assert topology.get_shortest_way(0, 3) == [0, 1, 3]
+
+
+def test_equal_costs_within_tolerance_are_ties():
+    topology = _make_topology([0, 1, 2], [(0, 1, 0.1), (1, 2, 0.2), (0, 2, 0.3)])
+    assert topology.get_shortest_ways(0) == {1: [0], 2: [0, 1]}
+    assert topology.get_next_hops(0) == {1: [1], 2: [1, 2]}
+
+
+def test_removing_one_tie_keeps_the_other():
+    topology = _make_topology([0, 1, 2, 3, 4], [(0, 1, 1), (0, 2, 1), (1, 3, 1), (2, 3, 1), (3, 4, 1)])
+    assert topology.get_next_hops(0)[4] == [1, 2]
+    topology.remove_edge(1, 3)
+    assert topology.get_shortest_ways(0) == {1: [0], 2: [0], 3: [2], 4: [3]}
+    assert topology.get_next_hops(0)[4] == [2]
+    topology.add_edge(1, 3, 1)
+    assert topology.get_next_hops(0)[4] == [1, 2]
+    topology.add_edge(1, 3, 0.5)
+    assert topology.get_shortest_ways(0)[3] == [1]
+    assert topology.get_next_hops(0)[4] == [1]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_next_hops_start_every_shortest_way(seed):
+    topology = _make_random_topology(Random(seed), 10, 30)
+    for root in topology.get_nodes():
+        for node, hops in topology.get_next_hops(root).items():
+            distance = _get_distance(topology, root, node)
+            expected = [hop for hop in topology.get_neighbors(root) if distance < float('inf') and
+                        abs(topology.get_weight(root, hop) + _get_distance(topology, hop, node) - distance) < 1e-9]
+            assert hops == sorted(expected)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_all_pairs_next_hops_match_dijkstra(seed):
+    random_ = Random(seed)
+    topology = _make_random_topology(random_, random_.randint(2, 25), random_.randint(0, 80))
+    distances = dict(nx.all_pairs_dijkstra_path_length(topology.graph))
+    all_pairs_next_hops = topology.all_pairs_next_hops()
+    assert sorted(all_pairs_next_hops) == sorted(topology.get_nodes())
+    for root, next_hops in all_pairs_next_hops.items():
+        assert next_hops == topology.get_next_hops(root)
+        for node, hops in next_hops.items():
+            expected = [hop for hop in topology.get_neighbors(root) if node in distances[root] and
+                        node in distances[hop] and
+                        topology.get_weight(root, hop) + distances[hop][node] == distances[root][node]]
+            assert hops == sorted(expected)
+
+
+def test_all_pairs_next_hops_follow_updates():
+    topology = _make_topology([0, 1, 2, 3], [(0, 1, 1), (0, 2, 1), (1, 3, 1), (2, 3, 1), (3, 0, 1)])
+    assert topology.all_pairs_next_hops()[0] == {1: [1], 2: [2], 3: [1, 2]}
+    topology.add_edge(0, 2, 5)
+    assert topology.all_pairs_next_hops()[0] == {1: [1], 2: [2], 3: [1]}
+    topology.remove_node(1)
+    assert topology.all_pairs_next_hops() == {0: {2: [2], 3: [2]}, 2: {0: [3], 3: [3]}, 3: {0: [0], 2: [0]}}
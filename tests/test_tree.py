@@ -0,0 +1,216 @@
+import pytest
+
+from applied_task.tree import MajorityTracker, Tree, TreeNode
+from itertools import permutations
+from random import Random
+from typing import Dict, List, Optional, Tuple
+
+
+class _BaselineNode:
+    id: int
+    input_value: bool
+    output_value: Optional[bool]
+    children: Dict[int, '_BaselineNode']
+
+    def __init__(self, id_: int, input_value: bool):
+        self.id = id_
+        self.input_value = input_value
+        self.output_value = None
+        self.children = {}
+
+    def setdefault(self, children_id: int, input_value: bool) -> '_BaselineNode':
+        return self.children.setdefault(children_id, _BaselineNode(children_id, input_value))
+
+
+def _get_paths(ids: List[int], m: int, id_: int) -> List[Tuple[int, ...]]:
+    other_ids = [other_id for other_id in ids if other_id != id_]
+    return [path + (id_,) for depth in range(min(m, len(other_ids)) + 1) for path in permutations(other_ids, depth)]
+
+
+def _make_trees(random_: Random, ids: List[int], m: int, id_: int,
+                paths: List[Tuple[int, ...]]) -> Tuple[Tree, _BaselineNode]:
+    root_value = random_.random() < 0.5
+    tree = Tree(0, root_value, ids, m + 1, id_)
+    baseline = _BaselineNode(0, root_value)
+    for path in paths:
+        value = random_.random() < 0.5
+        node = tree.root
+        baseline_node = baseline
+        for path_id in path:
+            node = node.setdefault(path_id, value)
+            baseline_node = baseline_node.setdefault(path_id, value)
+    return tree, baseline
+
+
+def _get_received_paths(random_: Random, paths: List[Tuple[int, ...]]) -> List[Tuple[int, ...]]:
+    received = set()
+    for path in sorted(paths, key=len):
+        if len(path) == 1 or (path[:-2] + path[-1:] in received and random_.random() < 0.8):
+            received.add(path)
+    return list(received)
+
+
+def _calculate_baseline_majority(node: _BaselineNode, id_: int) -> bool:
+    values = []
+    for child in node.children.values():
+        if child.id != id_:
+            _calculate_baseline_majority(child, id_)
+            values.append(child.children[id_].output_value)
+    own = node.children[id_]
+    values.append(own.input_value)
+    own.output_value = values.count(True) > values.count(False)
+    return own.output_value
+
+
+def _dump(node, path: Tuple[int, ...] = ()) -> Dict[Tuple[int, ...], Tuple[bool, Optional[bool], int]]:
+    dump = {}
+    children = node if isinstance(node, TreeNode) else node.children.values()
+    for child in children:
+        children_count = child.children_count if isinstance(child, TreeNode) else len(child.children)
+        dump[path + (child.id,)] = (child.input_value, child.output_value, children_count)
+        dump.update(_dump(child, path + (child.id,)))
+    return dump
+
+
+def _get_cases(count: int) -> List[Tuple[int, List[int], int, int]]:
+    random_ = Random(count)
+    cases = []
+    for seed in range(count):
+        ids = random_.sample(range(1, 20), random_.randint(1, 7))
+        cases.append((seed, ids, random_.randint(1, 4), random_.choice(ids)))
+    return cases
+
+
+@pytest.mark.parametrize('seed, ids, m, id_', _get_cases(100))
+def test_tree_matches_baseline(seed, ids, m, id_):
+    random_ = Random(seed)
+    paths = _get_paths(ids, m, id_)
+    random_.shuffle(paths)
+    tree, baseline = _make_trees(random_, ids, m, id_, paths)
+    assert tree.size == 1 + len({path[:length] for path in paths for length in range(1, len(path) + 1)})
+    assert _dump(tree.root) == _dump(baseline)
+    assert tree.root.children_count == len(baseline.children)
+
+
+def test_tree_rejects_paths_it_cannot_receive():
+    tree = Tree(0, True, [1, 2, 3, 4], 3, 2)
+    root = tree.root
+    assert root.get(1) is None
+    with pytest.raises(KeyError):
+        root[1]
+    node = root.setdefault(1, True)
+    assert root[1].input_value is True
+    assert root.setdefault(1, False).input_value is True
+    for children_id in (0, 1, 5):
+        with pytest.raises(KeyError):
+            node.setdefault(children_id, True)
+    leaf = node.setdefault(3, False)
+    with pytest.raises(KeyError):
+        leaf.setdefault(4, True)
+    assert leaf.setdefault(2, True).children_count == 0
+    with pytest.raises(KeyError):
+        leaf[2].setdefault(2, True)
+    assert [child.id for child in root] == [1]
+    assert [child.id for child in node] == [3]
+    assert root.children_count == 1
+
+
+def test_output_values_are_stored_per_node():
+    tree = Tree(0, False, [1, 2, 3], 2, 1)
+    own = tree.root.setdefault(1, False)
+    other = tree.root.setdefault(2, True).setdefault(1, True)
+    assert own.output_value is None
+    own.output_value = True
+    other.output_value = False
+    assert tree.root[1].output_value is True
+    assert tree.root[2][1].output_value is False
+    own.output_value = None
+    assert tree.root[1].output_value is None
+
+
+@pytest.mark.parametrize('seed, ids, m, id_', _get_cases(200))
+@pytest.mark.parametrize('is_complete', [True, False])
+def test_majority_matches_baseline(seed, ids, m, id_, is_complete):
+    random_ = Random(seed)
+    paths = _get_paths(ids, m, id_)
+    if not is_complete:
+        paths = _get_received_paths(random_, paths)
+    random_.shuffle(paths)
+    tree, baseline = _make_trees(random_, ids, m, id_, paths)
+    assert tree.calculate_majority() == _calculate_baseline_majority(baseline, id_)
+    assert _dump(tree.root) == _dump(baseline)
+
+
+@pytest.mark.parametrize('own_value, other_values, expected', [
+    (True, [], True),
+    (False, [], False),
+    (True, [False], False),
+    (True, [True, False], True),
+    (False, [True, True], True),
+    (True, [False, False, True], False),
+])
+def test_majority_ties_go_to_false(own_value, other_values, expected):
+    ids = list(range(1, len(other_values) + 2))
+    tree = Tree(0, own_value, ids, 2, 1)
+    tree.root.setdefault(1, own_value)
+    for other_id, value in zip(ids[1:], other_values):
+        tree.root.setdefault(other_id, value).setdefault(1, value)
+    assert tree.calculate_majority() is expected
+    assert tree.root[1].output_value is expected
+
+
+@pytest.mark.parametrize('seed, ids, m, id_', _get_cases(200))
+def test_tracker_matches_baseline(seed, ids, m, id_):
+    random_ = Random(seed)
+    paths = _get_paths(ids, m, id_)
+    random_.shuffle(paths)
+    root_value = random_.random() < 0.5
+    values = [random_.random() < 0.5 for _ in paths]
+    baseline = _BaselineNode(0, root_value)
+    for path, value in zip(paths, values):
+        node = baseline
+        for path_id in path:
+            node = node.setdefault(path_id, value)
+    expected = _calculate_baseline_majority(baseline, id_)
+
+    tracker = MajorityTracker(Tree(0, root_value, ids, m + 1, id_))
+    for path, value in zip(paths, values):
+        tracker.add(list(path), value)
+        assert tracker.value in (None, expected)
+    assert tracker.value is expected
+    assert _dump(tracker.tree.root) == _dump(baseline)
+
+
+def test_tracker_decides_before_all_messages_arrive():
+    tracker = MajorityTracker(Tree(0, True, [1, 2, 3, 4], 2, 1))
+    tracker.add([1], True)
+    tracker.add([2, 1], True)
+    assert tracker.value is None
+    tracker.add([3, 1], True)
+    assert tracker.value is True
+    assert tracker.tree.root[1].output_value is True
+    tracker.add([4, 1], False)
+    assert tracker.value is True
+
+
+def test_tracker_decides_ties_for_false():
+    tracker = MajorityTracker(Tree(0, True, [1, 2, 3, 4], 2, 1))
+    tracker.add([2, 1], False)
+    tracker.add([1], True)
+    tracker.add([3, 1], True)
+    assert tracker.value is None
+    tracker.add([4, 1], False)
+    assert tracker.value is False
+
+
+def test_tracker_ignores_foreign_and_repeated_paths():
+    tracker = MajorityTracker(Tree(0, False, [1, 2, 3], 2, 1))
+    tracker.add([2], True)
+    tracker.add([1, 2], True)
+    assert tracker.tree.root.children_count == 0
+    tracker.add([2, 1], True)
+    tracker.add([2, 1], True)
+    assert tracker.value is None
+    tracker.add([3, 1], True)
+    assert tracker.value is True
+    assert tracker.tree.root[2][1].input_value is True
@@ -0,0 +1,114 @@
+import numpy as np
+import os
+import pandas as pd
+import plotly.express as px
+
+from applied_task.network_layer.csr_graph import CsrGraph
+from applied_task.network_layer.topology import Topology
+from networkx import DiGraph, gnm_random_graph
+from queue import PriorityQueue
+from random import Random
+from time import perf_counter
+from typing import Callable, Dict, List, Set, Tuple
+
+
+def priority_queue_shortest_ways(graph: DiGraph, root_node: int,
+                                 cost_tolerance: float = 1e-9) -> Tuple[Dict[int, float], Dict[int, Set[int]]]:
+    distances = {node: float('inf') for node in graph}
+    distances[root_node] = 0
+    predecessors: Dict[int, Set[int]] = {node: set() for node in graph}
+
+    queue = PriorityQueue()
+    queue.put((0, root_node))
+
+    while not queue.empty():
+        (distance, node) = queue.get()
+        if distance > distances[node]:
+            continue
+
+        for neighbor, attrs in graph[node].items():
+            new_cost = distance + attrs['weight']
+            difference = new_cost - distances[neighbor]
+            if difference < -cost_tolerance * new_cost:
+                queue.put((new_cost, neighbor))
+                distances[neighbor] = new_cost
+                predecessors[neighbor] = {node}
+            elif difference <= cost_tolerance * new_cost:
+                predecessors[neighbor].add(node)
+
+    return distances, predecessors
+
+
+def line(nodes_count: int, random: Random) -> List[Tuple[int, int]]:
+    return [(node, node + 1) for node in range(nodes_count - 1)]
+
+
+def ring(nodes_count: int, random: Random) -> List[Tuple[int, int]]:
+    return [(node, (node + 1) % nodes_count) for node in range(nodes_count)]
+
+
+def star(nodes_count: int, random: Random) -> List[Tuple[int, int]]:
+    return [(0, node) for node in range(1, nodes_count)]
+
+
+def random_graph(nodes_count: int, random: Random) -> List[Tuple[int, int]]:
+    return list(gnm_random_graph(nodes_count, 3 * nodes_count, seed=random.randrange(1 << 32)).edges)
+
+
+GRAPHS: Dict[str, Callable[[int, Random], List[Tuple[int, int]]]] = {
+    'line': line,
+    'ring': ring,
+    'star': star,
+    'random': random_graph
+}
+
+
+def make_topology(graph_type: str, nodes_count: int, random: Random) -> Topology:
+    topology = Topology()
+    for node in range(nodes_count):
+        topology.add_node(node)
+    for src, dst in GRAPHS[graph_type](nodes_count, random):
+        weight = random.uniform(0.001, 0.01)
+        topology.add_edge(src, dst, weight)
+        topology.add_edge(dst, src, weight)
+    return topology
+
+
+def measure(function: Callable[[], object], tests_count: int) -> float:
+    elapsed_times = []
+    for _ in range(tests_count):
+        start = perf_counter()
+        function()
+        elapsed_times.append(perf_counter() - start)
+    return float(np.median(elapsed_times))
+
+
+def run(graph_type: str, nodes_count: int, tests_count: int = 5, seed: int = 0) -> Tuple[float, float, float]:
+    random = Random(seed)
+    graph = make_topology(graph_type, nodes_count, random).graph
+    root_node = random.randrange(nodes_count)
+    csr_graph = CsrGraph(graph)
+
+    priority_queue_time = measure(lambda: priority_queue_shortest_ways(graph, root_node), tests_count)
+    csr_build_time = measure(lambda: CsrGraph(graph), tests_count)
+    heap_time = measure(lambda: csr_graph.get_shortest_ways(root_node, 1e-9), tests_count)
+    return priority_queue_time, csr_build_time, heap_time
+
+
+def main():
+    nodes_counts = [10, 100, 1000, 10000]
+    df = pd.DataFrame(columns=['graph', 'nodes_count', 'priority_queue', 'csr_build', 'heap', 'speedup'])
+
+    for graph_type in GRAPHS:
+        for nodes_count in nodes_counts:
+            priority_queue_time, csr_build_time, heap_time = run(graph_type, nodes_count)
+            df.loc[len(df)] = [graph_type, nodes_count, priority_queue_time, csr_build_time, heap_time,
+                               priority_queue_time / heap_time]
+
+    print(df.to_string(index=False))
+    fig = px.line(df, x='nodes_count', y='speedup', color='graph', log_x=True)
+    fig.write_html(os.path.join('applied_task', 'network_layer', 'topology_benchmark_speedup.html'))
+
+
+if __name__ == '__main__':
+    main()